@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import re
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.llm.cache import DEFAULT_LLM_CACHE_DIR
+from src.llm.facts import DEFAULT_PAGE_TOKEN_BUDGET
+from src.pipeline import run_pipeline
+from src.render.chart_jobs import CHART_BACKENDS, CHART_FORMATS
+from src.step5_llm import DEFAULT_LLM_CONCURRENCY
+
+LOCALITY_SUFFIX = " Locality.json"
+RATES_SUFFIX = " Property Rates.json"
+
+PROGRESS_FILE = "batch_progress.json"
+REPORT_FILE = "batch_report.json"
+
+
+def _read_json(path: Path) -> Any:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _write_json(path: Path, obj: Any) -> None:
+    # write-then-rename so an interrupted run never leaves a truncated progress file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.strip().lower()).strip("-") or "locality"
+
+
+def _check_slugs(jobs: List[Dict[str, str]]) -> None:
+    """Raises ValueError if two jobs would write into the same outdir/<slug>/ folder."""
+    by_slug: Dict[str, List[str]] = {}
+    for job in jobs:
+        by_slug.setdefault(_slug(job["name"]), []).append(job["name"])
+    clashes = {slug: names for slug, names in by_slug.items() if len(names) > 1}
+    if clashes:
+        desc = "; ".join(f"{', '.join(map(repr, names))} -> {slug}/" for slug, names in sorted(clashes.items()))
+        raise ValueError(f"Localities share an output folder, rename them: {desc}")
+
+
+# -----------------------
+# Job discovery
+# -----------------------
+def discover_jobs(data_dir: Path) -> List[Dict[str, str]]:
+    """
+    Pairs "<Name> Locality.json" with "<Name> Property Rates.json" in data_dir.
+    Localities without a rates file are skipped.
+    """
+    jobs: List[Dict[str, str]] = []
+    for p in sorted(data_dir.glob(f"*{LOCALITY_SUFFIX}")):
+        name = p.name[: -len(LOCALITY_SUFFIX)]
+        rates = data_dir / f"{name}{RATES_SUFFIX}"
+        if rates.exists():
+            jobs.append({"name": name, "json1": str(p), "json2": str(rates)})
+    return jobs
+
+
+def load_manifest(path: Path) -> List[Dict[str, str]]:
+    """
+    Manifest: JSON list of {"name", "json1", "json2"}.
+    Relative json paths are resolved against the manifest's folder.
+    """
+    items = _read_json(path)
+    if not isinstance(items, list):
+        raise ValueError("Manifest must be a JSON list of {name, json1, json2}")
+    jobs: List[Dict[str, str]] = []
+    for it in items:
+        if not isinstance(it, dict):
+            raise ValueError(f"Manifest entry must be an object with name/json1/json2: {it!r}")
+        name, j1, j2 = it.get("name"), it.get("json1"), it.get("json2")
+        if not (name and j1 and j2):
+            raise ValueError(f"Manifest entry needs name/json1/json2: {it}")
+        j1p, j2p = Path(j1), Path(j2)
+        jobs.append({
+            "name": str(name),
+            "json1": str(j1p if j1p.is_absolute() else path.parent / j1p),
+            "json2": str(j2p if j2p.is_absolute() else path.parent / j2p),
+        })
+    return jobs
+
+
+# -----------------------
+# Worker
+# -----------------------
+def _run_job(job: Dict[str, str], outdir: str, opts: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs one locality in a worker process. Never raises: failures are reported."""
+    t0 = time.perf_counter()
+    try:
+        res = run_pipeline(job["json1"], job["json2"], Path(outdir), **opts)
+        return {
+            "status": "done",
+            "pdf": res["pdf"],
+            "validation_errors": len(res["quality"]["step1"]["validation"]["errors"]),
+            "timings_ms": res["timings_ms"],
+            "cache": res["cache"],
+            "llm_cache": res["llm_cache"],
+            "wall_ms": round((time.perf_counter() - t0) * 1000.0, 3),
+        }
+    except Exception as e:
+        return {
+            "status": "failed",
+            "error": f"{type(e).__name__}: {e}",
+            "traceback": traceback.format_exc(limit=5),
+            "wall_ms": round((time.perf_counter() - t0) * 1000.0, 3),
+        }
+
+
+# -----------------------
+# Reporting
+# -----------------------
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    # nearest-rank percentile
+    if not values:
+        return None
+    vals = sorted(values)
+    k = max(0, math.ceil(q / 100.0 * len(vals)) - 1)
+    return round(vals[k], 3)
+
+
+def build_throughput_report(
+    progress: Dict[str, Any], run_wall_s: float, ran: int, names: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Throughput/status summary. names limits it to this run's localities (the
+    progress file may also hold localities from earlier manifests).
+    """
+    items = progress.get("localities", {})
+    if names is not None:
+        items = {k: items[k] for k in names if k in items}
+    done = [v for v in items.values() if v.get("status") == "done"]
+    failed = [k for k, v in items.items() if v.get("status") == "failed"]
+
+    stage_ms: Dict[str, List[float]] = {}
+    for v in done:
+        for stage, ms in (v.get("timings_ms") or {}).items():
+            stage_ms.setdefault(stage, []).append(float(ms))
+    stage_ms.setdefault("total", []).extend(float(v.get("wall_ms") or 0.0) for v in done)
+
+    cache: Dict[str, Dict[str, int]] = {}
+    for v in done:
+        for stage, st in (v.get("cache") or {}).items():
+            agg = cache.setdefault(stage, {"hits": 0, "misses": 0})
+            agg["hits"] += st.get("hits", 0)
+            agg["misses"] += st.get("misses", 0)
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "localities_total": len(items),
+        "localities_done": len(done),
+        "localities_failed": failed,
+        "this_run": {
+            "processed": ran,
+            "wall_s": round(run_wall_s, 3),
+            "localities_per_min": round(ran / run_wall_s * 60.0, 3) if run_wall_s > 0 else None,
+        },
+        "stages_ms": {
+            stage: {"p50": _percentile(v, 50), "p95": _percentile(v, 95), "count": len(v)}
+            for stage, v in stage_ms.items()
+        },
+        "cache": cache or None,
+    }
+
+
+# -----------------------
+# Batch runner
+# -----------------------
+def _run_pool(
+    jobs: List[Dict[str, str]],
+    outdir: Path,
+    opts: Dict[str, Any],
+    workers: Optional[int],
+    record: Callable[[Dict[str, str], Dict[str, Any]], None],
+) -> Tuple[List[Tuple[Dict[str, str], BaseException]], List[Dict[str, str]]]:
+    """
+    Runs jobs in one process pool, at most `workers` in flight, recording each
+    result. If a worker dies the pool is broken: returns the jobs that were in
+    flight at that point (with the error) and the jobs never submitted.
+    """
+    n = workers or os.cpu_count() or 1
+    queue = list(jobs)
+    crashed: List[Tuple[Dict[str, str], BaseException]] = []
+    with ProcessPoolExecutor(max_workers=n) as pool:
+        running: Dict[Future, Dict[str, str]] = {}
+        while (queue and not crashed) or running:
+            while queue and not crashed and len(running) < n:
+                job = queue.pop(0)
+                running[pool.submit(_run_job, job, str(outdir / _slug(job["name"])), opts)] = job
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                job = running.pop(fut)
+                try:
+                    res = fut.result()
+                except Exception as e:  # BrokenProcessPool: _run_job itself never raises
+                    crashed.append((job, e))
+                    continue
+                record(job, res)
+    return crashed, queue
+
+
+def run_batch(
+    jobs: List[Dict[str, str]],
+    outdir: Path,
+    *,
+    workers: Optional[int] = None,
+    force: bool = False,
+    pipeline_opts: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Runs run_pipeline for every job across a process pool.
+    Each locality writes into outdir/<slug>/ (ValueError if two names share a
+    slug). Progress is recorded in outdir/batch_progress.json after every
+    locality, so a re-run skips localities already marked done (unless force=True).
+    """
+    _check_slugs(jobs)
+    outdir.mkdir(parents=True, exist_ok=True)
+    progress_path = outdir / PROGRESS_FILE
+    progress: Dict[str, Any] = _read_json(progress_path) if progress_path.exists() else {"localities": {}}
+    items = progress.setdefault("localities", {})
+
+    todo = []
+    for job in jobs:
+        prev = items.get(job["name"]) or {}
+        if prev.get("status") == "done" and not force:
+            continue
+        todo.append(job)
+
+    opts = pipeline_opts or {}
+
+    def record(job: Dict[str, str], res: Dict[str, Any]) -> None:
+        items[job["name"]] = {"json1": job["json1"], "json2": job["json2"], **res}
+        _write_json(progress_path, progress)
+        print(f"[{res['status']}] {job['name']} ({res['wall_ms'] / 1000.0:.1f}s)")
+
+    t0 = time.perf_counter()
+    # A worker killed mid-job (OOM killer, crash in native code) breaks the whole
+    # pool and fails every job still queued. Those go back to a fresh pool of the
+    # same size; only a job caught in a second crash is isolated and re-run on
+    # its own, so just the job that actually kills its worker is recorded as failed.
+    crashes: Dict[str, int] = {}
+    pending, isolated = todo, []
+    while pending:
+        crashed, unstarted = _run_pool(pending, outdir, opts, workers, record)
+        retry = []
+        for job, _ in crashed:
+            crashes[job["name"]] = crashes.get(job["name"], 0) + 1
+            (isolated if crashes[job["name"]] >= 2 else retry).append(job)
+        pending = retry + unstarted
+    for job in isolated:
+        t1 = time.perf_counter()
+        for _, e in _run_pool([job], outdir, opts, 1, record)[0]:
+            record(job, {
+                "status": "failed",
+                "error": f"{type(e).__name__}: worker process died ({e})",
+                "wall_ms": round((time.perf_counter() - t1) * 1000.0, 3),
+            })
+    run_wall_s = time.perf_counter() - t0
+
+    _write_json(progress_path, progress)
+    report = build_throughput_report(progress, run_wall_s, len(todo), names=[job["name"] for job in jobs])
+    _write_json(outdir / REPORT_FILE, report)
+    return report
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--data", default="data", help="Folder with '<Name> Locality.json' + '<Name> Property Rates.json' pairs")
+    src.add_argument("--manifest", default=None, help="JSON list of {name, json1, json2} (instead of --data discovery)")
+    ap.add_argument("--outdir", default="out/batch", help="Output root (one sub-folder per locality)")
+    ap.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    ap.add_argument("--force", action="store_true", help="Re-run localities already marked done")
+    ap.add_argument("--model", default=None, help="Optional model override (else OPENAI_MODEL/env)")
+    ap.add_argument("--skip-llm", action="store_true", help="Skip Step 5 narratives; render draft PDFs")
+    ap.add_argument("--persist", action="store_true", help="Also write intermediate payload/quality JSONs")
+    ap.add_argument("--cache-dir", default=None, help="Incremental build cache folder shared by all workers")
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="With --persist: per locality, redo only step-2 pages / narratives whose inputs changed since its last run",
+    )
+    ap.add_argument("--chart-format", choices=sorted(CHART_FORMATS), default="png", help="png or vector charts in the PDF")
+    ap.add_argument("--chart-backend", choices=CHART_BACKENDS, default="matplotlib", help="Chart library (reportlab skips matplotlib)")
+    ap.add_argument(
+        "--llm-concurrency", type=int, default=DEFAULT_LLM_CONCURRENCY, help="Per-page LLM requests in flight per locality"
+    )
+    ap.add_argument("--llm-cache-dir", default=DEFAULT_LLM_CACHE_DIR, help="LLM response cache folder shared by all workers")
+    ap.add_argument("--no-llm-cache", action="store_true", help="Neither read nor write the LLM response cache")
+    ap.add_argument("--refresh-llm", action="store_true", help="Ignore cached LLM responses; call the API and overwrite them")
+    ap.add_argument(
+        "--llm-token-budget", type=int, default=DEFAULT_PAGE_TOKEN_BUDGET, help="Estimated input tokens allowed per page of facts"
+    )
+    args = ap.parse_args()
+
+    jobs = load_manifest(Path(args.manifest)) if args.manifest else discover_jobs(Path(args.data))
+    if not jobs:
+        raise SystemExit("No locality pairs found.")
+
+    outdir = Path(args.outdir).expanduser()
+    report = run_batch(
+        jobs,
+        outdir,
+        workers=args.workers,
+        force=args.force,
+        pipeline_opts={
+            "model": args.model,
+            "skip_llm": args.skip_llm,
+            "persist": args.persist,
+            "incremental": args.incremental,
+            "cache_dir": Path(args.cache_dir).expanduser() if args.cache_dir else None,
+            # localities already run in parallel; a chart pool per worker would oversubscribe
+            "chart_workers": 1,
+            "chart_format": args.chart_format,
+            "chart_backend": args.chart_backend,
+            "llm_concurrency": args.llm_concurrency,
+            "llm_cache_dir": None if args.no_llm_cache else Path(args.llm_cache_dir).expanduser(),
+            "refresh_llm": args.refresh_llm,
+            "llm_token_budget": args.llm_token_budget,
+        },
+    )
+
+    print("Done.")
+    print(f"Progress: {outdir / PROGRESS_FILE}")
+    print(f"Report: {outdir / REPORT_FILE}")
+    print(
+        f"Processed {report['this_run']['processed']} locality(ies); "
+        f"done {report['localities_done']}/{report['localities_total']}; "
+        f"failed {len(report['localities_failed'])}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from src.render.pdf import render_pdf
+from src.step3 import generate_charts
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path: Path, obj: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "median": round(statistics.median(values), 3),
+        "min": round(min(values), 3),
+        "max": round(max(values), 3),
+    }
+
+
+# (name, backend, matplotlib format) compared by the benchmark
+CHART_VARIANTS: List[Tuple[str, str, str]] = [
+    ("matplotlib/png", "matplotlib", "png"),
+    ("matplotlib/vector", "matplotlib", "vector"),
+    ("reportlab", "reportlab", "png"),
+]
+
+# Cold start: a fresh interpreter imports the pipeline, draws the charts and
+# renders the PDF once; prints its timings as JSON on the last line.
+_COLD_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+from pathlib import Path
+from src.render.pdf import render_pdf
+from src.step3 import generate_charts
+t1 = time.perf_counter()
+inp, outdir, backend, fmt = sys.argv[1:5]
+p = json.loads(Path(inp).read_text(encoding="utf-8"))
+p["charts"] = generate_charts(p, Path(outdir) / "charts", workers=1, fmt=fmt, backend=backend)
+render_pdf(p, Path(outdir) / "report.pdf")
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000.0,
+    "report_ms": (t2 - t1) * 1000.0,
+    "matplotlib_loaded": "matplotlib" in sys.modules,
+}))
+"""
+
+
+def bench_chart_variants(payload: Dict[str, Any], outdir: Path, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Warm, in-process: charts + PDF for every backend/format (sequential, no caches).
+    Returns {variant: {"charts_ms", "pdf_ms", "total_ms", "pdf_bytes", "chart_bytes", "charts"}}.
+    """
+    out: Dict[str, Any] = {}
+    for name, backend, fmt in CHART_VARIANTS:
+        runs: Dict[str, List[float]] = {"charts_ms": [], "pdf_ms": [], "total_ms": []}
+        pdf_bytes = chart_bytes = 0
+        for i in range(repeat):
+            run_dir = outdir / name.replace("/", "-") / f"run{i}"
+            p = dict(payload)
+
+            t0 = time.perf_counter()
+            charts = generate_charts(p, run_dir / "charts", workers=1, fmt=fmt, backend=backend)
+            t1 = time.perf_counter()
+            p["charts"] = charts
+            out_pdf = run_dir / "report.pdf"
+            render_pdf(p, out_pdf)
+            t2 = time.perf_counter()
+
+            runs["charts_ms"].append((t1 - t0) * 1000.0)
+            runs["pdf_ms"].append((t2 - t1) * 1000.0)
+            runs["total_ms"].append((t2 - t0) * 1000.0)
+            pdf_bytes = out_pdf.stat().st_size
+            chart_bytes = sum(Path(v).stat().st_size for v in charts.values())
+
+        out[name] = {
+            **{k: _summary(v) for k, v in runs.items()},
+            "pdf_bytes": pdf_bytes,
+            "chart_bytes": chart_bytes,
+            "charts": len(charts),
+        }
+    return out
+
+
+def bench_cold_start(inp: Path, outdir: Path, repeat: int = 3) -> Dict[str, Any]:
+    """
+    One report per fresh interpreter, per backend/format: what a single PDF-only
+    run pays, imports included.
+    Returns {variant: {"import_ms", "report_ms", "wall_ms", "matplotlib_loaded"}}.
+    """
+    out: Dict[str, Any] = {}
+    for name, backend, fmt in CHART_VARIANTS:
+        runs: Dict[str, List[float]] = {"import_ms": [], "report_ms": [], "wall_ms": []}
+        loaded = False
+        for i in range(repeat):
+            run_dir = outdir / "cold" / name.replace("/", "-") / f"run{i}"
+            t0 = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, "-c", _COLD_SCRIPT, str(inp), str(run_dir), backend, fmt],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            wall = (time.perf_counter() - t0) * 1000.0
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            runs["import_ms"].append(r["import_ms"])
+            runs["report_ms"].append(r["report_ms"])
+            runs["wall_ms"].append(wall)
+            loaded = r["matplotlib_loaded"]
+        out[name] = {**{k: _summary(v) for k, v in runs.items()}, "matplotlib_loaded": loaded}
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in", dest="inp", required=True, help="Path to report_payload_step2.json (or later)")
+    ap.add_argument("--outdir", default="out/bench", help="Scratch folder for benchmark artifacts")
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per variant (median is reported)")
+    ap.add_argument("--skip-cold", action="store_true", help="Skip the fresh-interpreter cold-start runs")
+    args = ap.parse_args()
+
+    inp = Path(args.inp).expanduser()
+    payload = _read_json(inp)
+    outdir = Path(args.outdir).expanduser()
+
+    result: Dict[str, Any] = {}
+    if not args.skip_cold:
+        # first, before this process has imported anything heavy
+        result["cold_start"] = bench_cold_start(inp, outdir, repeat=args.repeat)
+
+    # warm imports/fonts for both backends so the first variant is not charged for them
+    for _, backend, fmt in CHART_VARIANTS:
+        generate_charts(dict(payload), outdir / "warmup", workers=1, fmt=fmt, backend=backend)
+
+    result["per_report"] = bench_chart_variants(payload, outdir, repeat=args.repeat)
+    _write_json(outdir / "benchmark.json", result)
+
+    print("Per report (warm, median):")
+    print(f"  {'variant':<18} {'charts ms':>10} {'pdf ms':>8} {'total ms':>9} {'pdf KB':>8}")
+    for name, r in result["per_report"].items():
+        print(
+            f"  {name:<18} {r['charts_ms']['median']:>10.0f} {r['pdf_ms']['median']:>8.0f} "
+            f"{r['total_ms']['median']:>9.0f} {r['pdf_bytes'] / 1024:>8.0f}"
+        )
+    if "cold_start" in result:
+        print("Cold start (fresh interpreter, median):")
+        print(f"  {'variant':<18} {'import ms':>10} {'report ms':>10} {'wall ms':>9} {'matplotlib':>11}")
+        for name, r in result["cold_start"].items():
+            print(
+                f"  {name:<18} {r['import_ms']['median']:>10.0f} {r['report_ms']['median']:>10.0f} "
+                f"{r['wall_ms']['median']:>9.0f} {'yes' if r['matplotlib_loaded'] else 'no':>11}"
+            )
+    print(f"Report: {outdir / 'benchmark.json'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+from src.render.pdf import render_city_book, report_page_count
+
+# newest first: the final (narrated) payload if the locality has one
+PAYLOAD_NAMES = ["report_payload_step5.json", "report_payload_step3.json"]
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def discover_payloads(batch_dir: Path) -> List[Path]:
+    """One payload per locality folder of a persisted batch run (src.batch --persist)."""
+    found: List[Path] = []
+    for d in sorted(p for p in batch_dir.iterdir() if p.is_dir()):
+        for name in PAYLOAD_NAMES:
+            if (d / name).exists():
+                found.append(d / name)
+                break
+    return found
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("payloads", nargs="*", help="report_payload_step3/step5.json files, in book order")
+    ap.add_argument("--batch-dir", default=None, help="Use every locality folder of a persisted batch run instead")
+    ap.add_argument("--title", default="City Book", help="Book title (contents page + PDF metadata)")
+    ap.add_argument("--out", required=True, help="Output PDF path")
+    args = ap.parse_args()
+
+    paths = [Path(p).expanduser() for p in args.payloads]
+    if args.batch_dir:
+        paths += discover_payloads(Path(args.batch_dir).expanduser())
+    if not paths:
+        raise SystemExit("No payloads given.")
+
+    payloads = [_read_json(p) for p in paths]
+    rendered = [p for p in payloads if report_page_count(p)]
+    if not rendered:
+        raise SystemExit("No payload has any report page.")
+
+    out = Path(args.out).expanduser()
+    out.parent.mkdir(parents=True, exist_ok=True)
+    render_city_book(rendered, out, title=args.title)
+
+    print("Done.")
+    print(f"Localities: {len(rendered)}")
+    if len(rendered) < len(payloads):
+        print(f"Skipped {len(payloads) - len(rendered)} payload(s) without report pages")
+    print(f"PDF: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,140 @@
 from __future__ import annotations
 
 import json
+import re
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 
-def load_json(path: str) -> Dict[str, Any]:
+def load_json(path: str, select: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Loads a top-level JSON object.
+
+    select: optional dot paths (e.g. "data.insightsData", "result.priceTrend").
+      When given, only those subtrees (plus their parent objects) are parsed;
+      every other value is skipped at tokenizer level without building Python
+      objects. Lookups on the selected paths behave exactly like a full load.
+    """
     p = Path(path)
     if not p.exists():
         raise FileNotFoundError(f"JSON file not found: {path}")
-    with p.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+    if select is None:
+        with p.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+    else:
+        data = _load_selected(p.read_bytes(), _build_select_tree(select))
     if not isinstance(data, dict):
         raise ValueError(f"Top-level JSON must be an object/dict. Got: {type(data)}")
-    return data
\ No newline at end of file
+    return data
+
+
+# -----------------------
+# Selective loader
+# -----------------------
+# A select tree maps key -> subtree; a leaf (None) means "keep the whole value".
+SelectTree = Dict[str, Optional["SelectTree"]]
+
+_WS = re.compile(rb"[ \t\n\r]*")
+_STRING = re.compile(rb'"(?:[^"\\]++|\\.)*+"')
+_SCALAR = re.compile(rb"[^,\]}\s]+")
+
+# Nested containers are skipped by one regex match (possessive, so linear time).
+# Bracket pairing is not enforced inside skipped values; values nested deeper
+# than _SKIP_DEPTH fall back to the regular decoder.
+_SKIP_DEPTH = 16
+
+
+def _compile_container_skipper(depth: int) -> "re.Pattern[bytes]":
+    body = rb'(?:[^"\[\]{}]++|"(?:[^"\\]++|\\.)*+")*+'
+    for _ in range(depth):
+        body = rb'(?:[^"\[\]{}]++|"(?:[^"\\]++|\\.)*+"|[\[{]' + body + rb"[\]}])*+"
+    return re.compile(rb"[\[{]" + body + rb"[\]}]")
+
+
+_CONTAINER = _compile_container_skipper(_SKIP_DEPTH)
+
+
+def _build_select_tree(paths: Iterable[str]) -> SelectTree:
+    tree: SelectTree = {}
+    for path in paths:
+        parts = [part.split("[", 1)[0] for part in path.split(".") if part]
+        node = tree
+        for i, part in enumerate(parts):
+            last = i == len(parts) - 1
+            if part in node and node[part] is None:
+                break  # an ancestor is already selected whole
+            if last:
+                node[part] = None
+            else:
+                node = node.setdefault(part, {})  # type: ignore[assignment]
+    return tree
+
+
+def _ws(buf: bytes, i: int) -> int:
+    return _WS.match(buf, i).end()  # type: ignore[union-attr]
+
+
+def _value_end(buf: bytes, i: int) -> int:
+    ch = buf[i : i + 1]
+    if ch == b'"':
+        m = _STRING.match(buf, i)
+    elif ch in (b"{", b"["):
+        m = _CONTAINER.match(buf, i)
+        if m is None:
+            # deeper than the skipper handles: let the real decoder find the end
+            text = buf.decode("utf-8")
+            _, end = json.JSONDecoder().raw_decode(text, len(buf[:i].decode("utf-8")))
+            return len(text[:end].encode("utf-8"))
+    else:
+        m = _SCALAR.match(buf, i)
+    if m is None:
+        raise ValueError(f"Invalid JSON value at byte {i}")
+    return m.end()
+
+
+def _select_object(buf: bytes, i: int, tree: SelectTree) -> Tuple[Dict[str, Any], int]:
+    # buf[i] is "{"
+    out: Dict[str, Any] = {}
+    i = _ws(buf, i + 1)
+    if buf[i : i + 1] == b"}":
+        return out, i + 1
+
+    while True:
+        m = _STRING.match(buf, i)
+        if m is None:
+            raise ValueError(f"Expected object key at byte {i}")
+        key = json.loads(m.group())
+        i = _ws(buf, m.end())
+        if buf[i : i + 1] != b":":
+            raise ValueError(f"Expected ':' at byte {i}")
+        i = _ws(buf, i + 1)
+
+        if key not in tree:
+            i = _value_end(buf, i)
+        else:
+            sub = tree[key]
+            if sub is not None and buf[i : i + 1] == b"{":
+                out[key], i = _select_object(buf, i, sub)
+            else:
+                end = _value_end(buf, i)
+                out[key] = json.loads(buf[i:end])
+                i = end
+
+        i = _ws(buf, i)
+        ch = buf[i : i + 1]
+        if ch == b",":
+            i = _ws(buf, i + 1)
+            continue
+        if ch == b"}":
+            return out, i + 1
+        raise ValueError(f"Expected ',' or '}}' at byte {i}")
+
+
+def _load_selected(buf: bytes, tree: SelectTree) -> Any:
+    i = _ws(buf, 0)
+    if buf[i : i + 1] != b"{":
+        return json.loads(buf)
+    data, end = _select_object(buf, i, tree)
+    if _ws(buf, end) != len(buf):
+        raise ValueError(f"Extra data after top-level object at byte {end}")
+    return data
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.build_cache import fingerprint
+
+DEFAULT_LLM_CACHE_DIR = ".cache/llm"
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_MB = 64
+EVICT_TO = 0.9  # evict() leaves this fraction of max_bytes, so the next puts do not rescan
+
+# Estimated size of each cache root in this process: scanned on the first put,
+# then grown by every put, so the full-directory scan of evict() only runs when
+# a put takes the cache over max_bytes (not after every report). Other
+# processes' writes are not counted; the next evict() scan sees them.
+_ROOT_BYTES: Dict[str, int] = {}
+
+
+def llm_cache_key(instructions: str, user_input: str, strict_schema: Dict[str, Any], model: str) -> str:
+    """What a structured response depends on: prompt, normalized schema and model."""
+    return fingerprint(instructions, user_input, strict_schema, model)
+
+
+class LLMCache:
+    """
+    Structured LLM responses on local disk, shared across runs and processes:
+      <root>/<key[:2]>/<key>.json   {"created": unix time, "model": ..., "response": {...}}
+    Entries older than ttl_s are treated as misses. Entries are touched on
+    every hit; evict() drops expired entries, then least recently used ones
+    until the cache fits in EVICT_TO * max_bytes. put() calls it when a write
+    takes the cache over max_bytes.
+    refresh=True never reads the cache but still stores fresh responses.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        ttl_s: float = DEFAULT_TTL_DAYS * 86400,
+        max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+        refresh: bool = False,
+    ) -> None:
+        self.root = Path(root)
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.refresh:
+            self.misses += 1
+            return None
+        p = self._path(key)
+        try:
+            entry = json.loads(p.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if time.time() - float(entry.get("created", 0)) > self.ttl_s:
+            self.expired += 1
+            self.misses += 1
+            p.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(p)
+        except OSError:
+            pass
+        self.hits += 1
+        return entry["response"]
+
+    def put(self, key: str, response: Dict[str, Any], model: str) -> None:
+        p = self._path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(f".{p.name}.{uuid.uuid4().hex}.tmp")
+        entry = {"created": time.time(), "model": model, "response": response}
+        data = json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        tmp.write_bytes(data)
+        os.replace(tmp, p)
+
+        root = str(self.root.resolve())
+        if root in _ROOT_BYTES:
+            _ROOT_BYTES[root] += len(data)
+        else:
+            _ROOT_BYTES[root] = sum(size for _, size, _ in self._entries())
+        if _ROOT_BYTES[root] > self.max_bytes:
+            self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries: List[Tuple[float, int, Path]] = []
+        for p in self.root.glob("*/*.json"):
+            if p.name.startswith("."):
+                continue  # in-flight temp file
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        return entries
+
+    def evict(self) -> None:
+        now = time.time()
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, p in sorted(entries):
+            # never touched for longer than the TTL: created before it too, so expired
+            if total <= self.max_bytes * EVICT_TO and now - mtime <= self.ttl_s:
+                continue
+            try:
+                p.unlink()
+            except OSError:
+                # another worker already evicted it
+                pass
+            total -= size
+            self.evictions += 1
+        _ROOT_BYTES[str(self.root.resolve())] = total
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "expired": self.expired, "evictions": self.evictions}
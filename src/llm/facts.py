@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from src.utils.build_cache import canonical_json
+
+# Fact bundles for the narrative prompts. Each page contributes its curated
+# narrative_inputs first, then computed; raw `data` is only sent for a page
+# that has neither (computed is derived from it). Values are compacted
+# (no nulls/empties/URLs, floats rounded), any block already sent earlier in
+# the bundle is dropped, and each page is held to a token budget by
+# shortening its longest lists (lists are ranked, so the head is kept).
+
+DEFAULT_PAGE_TOKEN_BUDGET = 1500
+
+PAGE_SECTIONS = ("narrative_inputs", "computed")
+FLOAT_DIGITS = 2
+MIN_DEDUPE_CHARS = 40  # smaller repeats cost less than the bookkeeping
+META_FIELDS = ("locality", "city", "micromarket")  # not generated_at: it would change every prompt
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local BPE-ish estimate: letter runs ~4 chars/token, digit runs ~3
+    digits/token, every other non-space character one token.
+    """
+    n = 0
+    for m in _TOKEN_RE.finditer(text):
+        s = m.group()
+        if s[0].isalpha():
+            n += math.ceil(len(s) / 4)
+        elif s[0].isdigit():
+            n += math.ceil(len(s) / 3)
+        else:
+            n += 1
+    return n
+
+
+def compact_json(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _compact(v: Any) -> Any:
+    """Drops None/empty values and URLs, rounds floats. Returns None for nothing left."""
+    if isinstance(v, dict):
+        out = {}
+        for k, x in v.items():
+            x = _compact(x)
+            if x is not None:
+                out[k] = x
+        return out or None
+    if isinstance(v, list):
+        out_l = [x for x in (_compact(x) for x in v) if x is not None]
+        return out_l or None
+    if isinstance(v, float):
+        if not math.isfinite(v):
+            return None
+        r = round(v, FLOAT_DIGITS)
+        return int(r) if r.is_integer() else r
+    if isinstance(v, str):
+        s = v.strip()
+        if not s or s.startswith(("http://", "https://")):
+            return None
+        return s
+    return v
+
+
+def _dedupe(v: Any, seen: Set[bytes]) -> Any:
+    """Removes dict values whose content already appeared (first copy wins)."""
+    if isinstance(v, dict):
+        out = {}
+        for k, x in v.items():
+            if isinstance(x, (dict, list)):
+                sig = canonical_json(x)
+                if len(sig) >= MIN_DEDUPE_CHARS:
+                    if sig in seen:
+                        continue
+                    seen.add(sig)
+                x = _dedupe(x, seen)
+            out[k] = x
+        return out
+    if isinstance(v, list):
+        return [_dedupe(x, seen) for x in v]
+    return v
+
+
+def _longest_list(v: Any) -> Optional[List[Any]]:
+    """The longest list (by serialized size) that still has more than one item."""
+    best: Optional[List[Any]] = None
+    best_size = 0
+    stack = [v]
+    while stack:
+        x = stack.pop()
+        if isinstance(x, dict):
+            stack.extend(x.values())
+        elif isinstance(x, list):
+            if len(x) > 1:
+                size = len(compact_json(x))
+                if size > best_size:
+                    best, best_size = x, size
+            stack.extend(x)
+    return best
+
+
+def _fit(facts: Any, budget: int) -> Any:
+    """Halves the longest list until the page fits its token budget (or nothing can shrink)."""
+    while estimate_tokens(compact_json(facts)) > budget:
+        lst = _longest_list(facts)
+        if lst is None:
+            break
+        del lst[max(1, len(lst) // 2):]
+    return facts
+
+
+def page_facts(page: Dict[str, Any]) -> Dict[str, Any]:
+    """narrative_inputs + computed; data only if the page has neither."""
+    out = {s: page.get(s) for s in PAGE_SECTIONS if page.get(s)}
+    if isinstance(out.get("computed"), dict):
+        # earlier narratives attached by step 5 are output, not facts
+        out["computed"] = {k: v for k, v in out["computed"].items() if k not in ("narratives", "narrative")}
+    if not out and page.get("data"):
+        out["data"] = page["data"]
+    return out
+
+
+@dataclass
+class FactBundle:
+    text: str
+    tokens: Dict[str, Dict[str, int]] = field(default_factory=dict)  # page -> {"before", "after"}
+
+    @property
+    def tokens_before(self) -> int:
+        return sum(t["before"] for t in self.tokens.values())
+
+    @property
+    def tokens_after(self) -> int:
+        return sum(t["after"] for t in self.tokens.values())
+
+
+def build_fact_bundle(
+    payload: Dict[str, Any],
+    pages: List[str],
+    budget: int = DEFAULT_PAGE_TOKEN_BUDGET,
+) -> FactBundle:
+    """
+    {"meta": ..., page: facts, ...} as compact JSON, each page within `budget`
+    tokens. tokens[page]["before"] is what the page cost as the old indented
+    data + computed + narrative_inputs dump.
+    """
+    seen: Set[bytes] = set()
+    meta = payload.get("meta") or {}
+    bundle: Dict[str, Any] = {"meta": _compact({k: meta.get(k) for k in META_FIELDS}) or {}}
+    tokens: Dict[str, Dict[str, int]] = {}
+    for page_key in pages:
+        page = payload.get(page_key, {}) or {}
+        before = {
+            "data": page.get("data", {}) or {},
+            "computed": page.get("computed", {}) or {},
+            "narrative_inputs": page.get("narrative_inputs", {}) or {},
+        }
+        facts = _fit(_dedupe(_compact(page_facts(page)) or {}, seen), budget)
+        bundle[page_key] = facts
+        tokens[page_key] = {
+            "before": estimate_tokens(json.dumps(before, ensure_ascii=False, indent=2)),
+            "after": estimate_tokens(compact_json(facts)),
+        }
+    return FactBundle(text=compact_json(bundle), tokens=tokens)
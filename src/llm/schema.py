@@ -92,4 +92,15 @@ NARRATIVE_SCHEMA: Dict[str, Any] = {
             "properties": {"conclusion": {"type": "string"}},
         },
     },
-}
\ No newline at end of file
+}
+NARRATIVE_PAGES = list(NARRATIVE_SCHEMA["required"])
+
+
+def page_schema(page_key: str) -> Dict[str, Any]:
+    """NARRATIVE_SCHEMA cut down to one page, for per-page requests (same output shape)."""
+    return {
+        "type": "object",
+        "additionalProperties": False,
+        "required": [page_key],
+        "properties": {page_key: NARRATIVE_SCHEMA["properties"][page_key]},
+    }
@@ -2,13 +2,13 @@ from __future__ import annotations
 
 import argparse
 import json
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 from src.data_io.json_loader import load_json
-from src.transform.extract_sources import extract_sources
-from src.validate.quality import validate_inputs
+from src.transform.ingest import JSON1_INGEST_PATHS, JSON2_INGEST_PATHS, ingest_inputs
 
 
 def _write_json(path: Path, obj: Dict[str, Any]) -> None:
@@ -16,6 +16,19 @@ def _write_json(path: Path, obj: Dict[str, Any]) -> None:
     path.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
 
 
+def load_inputs(json1_path: str, json2_path: str, *, selective: bool = False) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Loads both raw inputs. With selective=True only the subtrees read by
+    validate_inputs + extract_sources are parsed (JSON-1 carries ~2 MB of
+    topDevelopers/featuredProjects that the report never uses).
+    """
+    if not selective:
+        return load_json(json1_path), load_json(json2_path)
+    json1 = load_json(json1_path, select=JSON1_INGEST_PATHS)
+    json2 = load_json(json2_path, select=JSON2_INGEST_PATHS)
+    return json1, json2
+
+
 def build_report_payload(sources: Dict[str, Any]) -> Dict[str, Any]:
     """
     Step-1 payload: merged canonical sources + page-wise placeholders wired to your 12-page architecture.
@@ -167,31 +180,47 @@ def build_report_payload(sources: Dict[str, Any]) -> Dict[str, Any]:
     return payload
 
 
+def build_quality_report(
+    json1_path: str, json2_path: str, validation: Dict[str, Any], timings: Dict[str, Any]
+) -> Dict[str, Any]:
+    return {
+        "inputs": {"json1_path": json1_path, "json2_path": json2_path},
+        "validation": validation,
+        "timings_ms": timings,
+        "notes": [
+            "Step 1 merges + validates only. No charts or LLM narrative is generated here.",
+            "Warnings represent optional blocks missing in the provided JSONs (no assumptions made).",
+        ],
+    }
+
+
 def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--json1", required=True, help="Path to Locality.json")
     ap.add_argument("--json2", required=True, help="Path to Property Rates.json")
     ap.add_argument("--out", default="out", help="Output folder")
+    ap.add_argument(
+        "--selective",
+        action="store_true",
+        help="Parse only the JSON subtrees the report reads (skips unused blocks at tokenizer level)",
+    )
     args = ap.parse_args()
 
-    json1 = load_json(args.json1)
-    json2 = load_json(args.json2)
+    t0 = time.perf_counter()
+    json1, json2 = load_inputs(args.json1, args.json2, selective=args.selective)
+    load_ms = round((time.perf_counter() - t0) * 1000.0, 3)
 
-    validation = validate_inputs(json1, json2)
-    sources = extract_sources(json1, json2)
-    report_payload = build_report_payload(sources)
+    # Single pass: canonical sources + validation report
+    ingest = ingest_inputs(json1, json2)
+    validation = ingest["validation"]
+    timings = ingest["timings_ms"]
+    timings["stages"] = {"load": load_ms, **timings["stages"]}
+    report_payload = build_report_payload(ingest["sources"])
 
     out_dir = Path(args.out)
     _write_json(out_dir / "report_payload.json", report_payload)
 
-    quality_report = {
-        "inputs": {"json1_path": args.json1, "json2_path": args.json2},
-        "validation": validation,
-        "notes": [
-            "Step 1 merges + validates only. No charts or LLM narrative is generated here.",
-            "Warnings represent optional blocks missing in the provided JSONs (no assumptions made).",
-        ],
-    }
+    quality_report = build_quality_report(args.json1, args.json2, validation, timings)
     _write_json(out_dir / "quality_report.json", quality_report)
 
     print("Done.")
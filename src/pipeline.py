@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import reportlab
+
+from src.main import build_quality_report, build_report_payload, load_inputs
+from src.llm.cache import DEFAULT_LLM_CACHE_DIR, LLMCache
+from src.llm.facts import DEFAULT_PAGE_TOKEN_BUDGET
+from src.render.chart_cache import ChartCache
+from src.render.chart_jobs import CHART_BACKENDS, CHART_FORMATS
+from src.render.pdf import render_pdf
+from src.step3 import build_step3_quality, generate_charts
+from src.step5_llm import DEFAULT_LLM_CONCURRENCY, generate_narratives
+from src.transform.compute_pages import compute_step2
+from src.transform.ingest import ingest_inputs
+from src.utils.build_cache import BuildCache, code_version, file_digest, fingerprint, payload_fingerprint
+
+# Code each cached stage depends on: code_version also hashes every src module
+# these import (render_pdf -> rl_charts, text_layout, ...), so any change there
+# invalidates the stage too.
+STEP1_CODE = (
+    "src.main",
+    "src.transform.ingest",
+    "src.transform.extract_sources",
+    "src.validate.quality",
+    "src.utils.json_path",
+)
+STEP2_CODE = ("src.transform.compute_pages",)
+PDF_CODE = ("src.render.pdf",)
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _write_json(path: Path, obj: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def run_pipeline(
+    json1_path: str,
+    json2_path: str,
+    outdir: Path,
+    *,
+    model: Optional[str] = None,
+    skip_llm: bool = False,
+    persist: bool = False,
+    selective: bool = True,
+    cache_dir: Optional[Path] = None,
+    incremental: bool = False,
+    chart_workers: Optional[int] = None,
+    chart_format: str = "png",
+    chart_backend: str = "matplotlib",
+    pdf_workers: int = 1,
+    llm_concurrency: int = DEFAULT_LLM_CONCURRENCY,
+    llm_cache_dir: Optional[Path] = Path(DEFAULT_LLM_CACHE_DIR),
+    refresh_llm: bool = False,
+    llm_token_budget: int = DEFAULT_PAGE_TOKEN_BUDGET,
+) -> Dict[str, Any]:
+    """
+    Step 1 -> 2 -> 3 -> 5 in memory: the payload dict is handed from stage to
+    stage without the JSON write/re-read between scripts.
+
+    persist=True also writes the per-step artifacts the individual scripts
+    produce (report_payload*.json, quality_report*.json).
+    skip_llm=True stops after charts and renders the draft PDF (no narratives).
+    cache_dir enables the incremental build cache: every stage is keyed by a
+    content hash of its inputs + code version and skipped on a match; single
+    chart PNGs are also reused across localities from <cache_dir>/chart_png.
+    incremental=True diffs against outdir/report_payload_step2.json (left by an
+    earlier persist run) and recomputes only the step-2 pages whose inputs changed;
+    likewise narratives are regenerated only for pages whose LLM facts changed
+    since outdir/report_payload_step5.json (unless refresh_llm).
+    chart_workers: chart process pool size (None = CPU count, 1 = in-process).
+    chart_format="vector" draws charts into the PDF as vector graphics (no PNGs).
+    chart_backend="reportlab" draws charts natively with ReportLab (matplotlib is never imported).
+    pdf_workers > 1 renders page groups in worker processes and merges them.
+    llm_concurrency: per-page narrative requests in flight at once.
+    llm_cache_dir: LLM response cache (None = always call the API);
+    refresh_llm=True ignores cached responses and overwrites them.
+    llm_token_budget: estimated input tokens allowed per page of facts.
+
+    Returns {"locality", "payload", "pdf", "charts", "quality", "timings_ms", "cache", "llm_cache"}.
+    """
+    outdir.mkdir(parents=True, exist_ok=True)
+    cache = BuildCache(cache_dir) if cache_dir is not None else None
+    chart_cache = ChartCache(Path(cache_dir) / "chart_png") if cache_dir is not None else None
+    llm_cache = LLMCache(llm_cache_dir, refresh=refresh_llm) if llm_cache_dir is not None else None
+    timings: Dict[str, float] = {}
+    quality: Dict[str, Any] = {}
+
+    def _timed(stage: str, t0: float) -> None:
+        timings[stage] = round((time.perf_counter() - t0) * 1000.0, 3)
+
+    # Step 1: load + single-pass ingest + payload
+    t0 = time.perf_counter()
+    step1 = None
+    if cache is not None:
+        key = fingerprint(file_digest(Path(json1_path)), file_digest(Path(json2_path)), code_version(*STEP1_CODE))
+        step1 = cache.get_json("step1", key)
+    if step1 is None:
+        json1, json2 = load_inputs(json1_path, json2_path, selective=selective)
+        _timed("load", t0)
+        t0 = time.perf_counter()
+        ingest = ingest_inputs(json1, json2)
+        del json1, json2
+        step1 = {
+            "payload": build_report_payload(ingest["sources"]),
+            "validation": ingest["validation"],
+            "timings_ms": ingest["timings_ms"],
+        }
+        if cache is not None:
+            cache.put_json("step1", key, step1)
+    payload = step1["payload"]
+    _timed("step1", t0)
+
+    quality["step1"] = build_quality_report(json1_path, json2_path, step1["validation"], step1["timings_ms"])
+    if persist:
+        _write_json(outdir / "report_payload.json", payload)
+        _write_json(outdir / "quality_report.json", quality["step1"])
+
+    # Step 2: computed blocks
+    t0 = time.perf_counter()
+    step2 = None
+    if cache is not None:
+        key = fingerprint(payload_fingerprint(payload), code_version(*STEP2_CODE))
+        step2 = cache.get_json("step2", key)
+    if step2 is None:
+        prev_path = outdir / "report_payload_step2.json"
+        previous = _read_json(prev_path) if incremental and prev_path.exists() else None
+        step2_payload, step2_quality = compute_step2(payload, previous=previous)
+        step2 = {"payload": step2_payload, "quality": step2_quality}
+        if cache is not None:
+            cache.put_json("step2", key, step2)
+    payload, quality["step2"] = step2["payload"], step2["quality"]
+    _timed("step2", t0)
+    if persist:
+        _write_json(outdir / "report_payload_step2.json", payload)
+        _write_json(outdir / "quality_report_step2.json", quality["step2"])
+
+    # Step 3: charts
+    t0 = time.perf_counter()
+    charts = generate_charts(
+        payload, outdir / "charts", cache=cache, workers=chart_workers, chart_cache=chart_cache, fmt=chart_format,
+        backend=chart_backend,
+    )
+    payload["charts"] = charts
+    _timed("charts", t0)
+    quality["step3"] = build_step3_quality(payload, charts, chart_cache)
+    if persist:
+        _write_json(outdir / "report_payload_step3.json", payload)
+        _write_json(outdir / "quality_report_step3.json", quality["step3"])
+
+    # Step 5: narratives
+    if not skip_llm:
+        t0 = time.perf_counter()
+        prev_path = outdir / "report_payload_step5.json"
+        previous = _read_json(prev_path) if incremental and not refresh_llm and prev_path.exists() else None
+        generate_narratives(
+            payload,
+            model=model,
+            cache=llm_cache,
+            concurrency=llm_concurrency,
+            budget=llm_token_budget,
+            previous=previous,
+        )
+        _timed("llm", t0)
+        if persist:
+            _write_json(outdir / "report_payload_step5.json", payload)
+
+    # PDF
+    locality = (payload.get("meta", {}) or {}).get("locality", "Locality")
+    suffix = "" if skip_llm else " - Final"
+    out_pdf = outdir / f"{locality} Locality Report{suffix}.pdf"
+    t0 = time.perf_counter()
+    restored = None
+    if cache is not None:
+        # charts by content, not by path: the paths live under outdir, so the
+        # same report built into another folder must still hit
+        chart_digests = {k: file_digest(Path(v)) for k, v in charts.items() if Path(v).exists()}
+        content = {k: v for k, v in payload.items() if k != "charts"}
+        key = fingerprint(payload_fingerprint(content), chart_digests, code_version(*PDF_CODE), reportlab.Version)
+        restored = cache.get_files("pdf", key, outdir)
+    if restored is not None:
+        out_pdf = Path(restored["pdf"])
+    else:
+        render_pdf(payload, out_pdf, page_workers=pdf_workers)
+        if cache is not None:
+            cache.put_files("pdf", key, {"pdf": str(out_pdf)})
+    _timed("pdf", t0)
+
+    return {
+        "locality": locality,
+        "payload": payload,
+        "pdf": str(out_pdf),
+        "charts": charts,
+        "quality": quality,
+        "timings_ms": timings,
+        "cache": {**cache.stats(), "chart_png": chart_cache.stats()} if cache is not None else None,
+        "llm_cache": llm_cache.stats() if llm_cache is not None and not skip_llm else None,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--json1", required=True, help="Path to Locality.json")
+    ap.add_argument("--json2", required=True, help="Path to Property Rates.json")
+    ap.add_argument("--outdir", default="out", help="Output directory")
+    ap.add_argument("--model", default=None, help="Optional model override (else OPENAI_MODEL/env)")
+    ap.add_argument("--skip-llm", action="store_true", help="Skip Step 5 narratives; render the draft PDF")
+    ap.add_argument("--persist", action="store_true", help="Also write intermediate payload/quality JSONs")
+    ap.add_argument("--full-load", action="store_true", help="Parse the full input JSONs (default: selective)")
+    ap.add_argument("--cache-dir", default=None, help="Enable the incremental build cache in this folder")
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Recompute only step-2 pages / narratives whose inputs changed vs. the previous persisted run",
+    )
+    ap.add_argument("--chart-workers", type=int, default=None, help="Chart process pool size (default: CPU count; 1 = in-process)")
+    ap.add_argument("--chart-format", choices=sorted(CHART_FORMATS), default="png", help="png or vector charts in the PDF")
+    ap.add_argument("--chart-backend", choices=CHART_BACKENDS, default="matplotlib", help="Chart library (reportlab skips matplotlib)")
+    ap.add_argument("--pdf-workers", type=int, default=1, help="Render page groups in N processes and merge (needs pypdf)")
+    ap.add_argument(
+        "--llm-concurrency", type=int, default=DEFAULT_LLM_CONCURRENCY, help="Per-page LLM requests in flight at once"
+    )
+    ap.add_argument("--llm-cache-dir", default=DEFAULT_LLM_CACHE_DIR, help="LLM response cache folder")
+    ap.add_argument("--no-llm-cache", action="store_true", help="Neither read nor write the LLM response cache")
+    ap.add_argument("--refresh-llm", action="store_true", help="Ignore cached LLM responses; call the API and overwrite them")
+    ap.add_argument(
+        "--llm-token-budget", type=int, default=DEFAULT_PAGE_TOKEN_BUDGET, help="Estimated input tokens allowed per page of facts"
+    )
+    args = ap.parse_args()
+
+    res = run_pipeline(
+        args.json1,
+        args.json2,
+        Path(args.outdir).expanduser(),
+        model=args.model,
+        skip_llm=args.skip_llm,
+        persist=args.persist,
+        selective=not args.full_load,
+        cache_dir=Path(args.cache_dir).expanduser() if args.cache_dir else None,
+        incremental=args.incremental,
+        chart_workers=args.chart_workers,
+        chart_format=args.chart_format,
+        chart_backend=args.chart_backend,
+        pdf_workers=args.pdf_workers,
+        llm_concurrency=args.llm_concurrency,
+        llm_cache_dir=None if args.no_llm_cache else Path(args.llm_cache_dir).expanduser(),
+        refresh_llm=args.refresh_llm,
+        llm_token_budget=args.llm_token_budget,
+    )
+
+    print("Done.")
+    print(f"PDF: {res['pdf']}")
+    print("Timings (ms): " + ", ".join(f"{k}={v:.0f}" for k, v in res["timings_ms"].items()))
+    if res["cache"] is not None:
+        print("Cache: " + ", ".join(f"{k} {v['hits']} hit/{v['misses']} miss" for k, v in res["cache"].items()))
+    if res["llm_cache"] is not None:
+        print(f"LLM cache: {res['llm_cache']['hits']} hit/{res['llm_cache']['misses']} miss")
+    errors = res["quality"]["step1"]["validation"]["errors"]
+    if errors:
+        print(f"Validation errors: {len(errors)} (run with --persist to write quality_report.json)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from src.render.chart_jobs import CHART_DPI, CHART_FIGSIZES, ChartJob, backend_modules, backend_version
+from src.utils.build_cache import code_version, fingerprint
+
+DEFAULT_MAX_MB = 256
+
+
+def chart_job_key(job: ChartJob) -> str:
+    """Content hash of what a chart looks like: backend, format, renderer, data, size, dpi, code + library version."""
+    return fingerprint(
+        job.backend,
+        Path(job.out_path).suffix,
+        job.kind,
+        job.params,
+        CHART_FIGSIZES.get(job.kind),
+        CHART_DPI,
+        backend_version(job.backend),
+        code_version(*backend_modules(job.backend)),
+    )
+
+
+def _place(src: Path, dst: Path) -> None:
+    # never write through an existing file: it may be a hard link into the cache
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class ChartCache:
+    """
+    Content-addressed chart cache shared across runs:
+      <root>/<key[:2]>/<key>.png   (or .json for vector display lists / chart specs)
+    A hit is hard-linked (or copied, across filesystems) into charts/.
+    Entries are touched on every hit; evict() drops least recently used
+    entries until the cache fits in max_bytes.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    def get(self, key: str, dst: Path) -> bool:
+        p = self._path(key, dst.suffix)
+        try:
+            _place(p, dst)
+            os.utime(p)
+        except OSError:
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def put(self, key: str, src: Path) -> None:
+        p = self._path(key, src.suffix)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(f".{p.name}.{uuid.uuid4().hex}.tmp")
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, p)
+
+    def evict(self) -> None:
+        entries: List[Tuple[float, int, Path]] = []
+        for p in self.root.glob("*/*.*"):
+            if p.name.startswith("."):
+                continue  # in-flight temp file
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                # another worker already evicted it
+                pass
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import importlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Backend-neutral chart job layer. Nothing here imports matplotlib: the
+# matplotlib backend (src/render/charts.py) is only loaded when a job asks for it.
+
+CHART_DPI = 200
+CHART_FIGSIZES: Dict[str, Tuple[float, float]] = {
+    "price_trend": (8, 3.5),
+    "histogram_buckets": (8, 3.5),
+    "rent_by_bhk": (8, 3.5),
+    "nearby_rates": (8, 4.0),
+    "dual_gap_bars": (9, 3.8),
+    "simple_bar": (9, 3.8),
+}
+
+# Chart documents: JSON files render_pdf draws itself (vector display lists
+# from the matplotlib backend, chart specs from the reportlab backend).
+CHART_DOC_SUFFIX = ".json"
+# matplotlib output format -> file suffix
+CHART_FORMATS: Dict[str, str] = {"png": ".png", "vector": CHART_DOC_SUFFIX}
+CHART_BACKENDS: Tuple[str, ...] = ("matplotlib", "reportlab")
+
+_BACKEND_MODULES: Dict[str, Tuple[str, ...]] = {
+    "matplotlib": ("src.render.charts", "src.render.chart_vector", "src.utils.money"),
+    "reportlab": ("src.render.rl_charts", "src.utils.money"),
+}
+
+
+@dataclass(frozen=True)
+class ChartJob:
+    """
+    Pure description of one chart: renderer kind, its keyword arguments, the
+    output path and the backend. Picklable, so jobs can be rendered in worker processes.
+    """
+    key: str
+    kind: str
+    out_path: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    backend: str = "matplotlib"
+
+
+def backend_modules(backend: str) -> Tuple[str, ...]:
+    """Modules whose source determines what a backend draws (for cache keys)."""
+    return _BACKEND_MODULES[backend]
+
+
+def backend_version(backend: str) -> str:
+    """Version of the drawing library behind a backend (for cache keys)."""
+    if backend == "reportlab":
+        import reportlab
+
+        return reportlab.Version
+    import matplotlib
+
+    return matplotlib.__version__
+
+
+def render_chart_job(job: ChartJob) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Renders one job. Never raises: returns (key, path, None) on success and
+    (key, None, error) on failure, so one bad chart cannot sink the others.
+    """
+    out = Path(job.out_path)
+    try:
+        # replace, never overwrite in place: the old file may be a hard link into a chart cache
+        out.unlink(missing_ok=True)
+        if job.backend == "reportlab":
+            from src.render.rl_charts import write_chart_spec
+
+            write_chart_spec(job.kind, job.params, out)
+        else:
+            from src.render.charts import CHART_RENDERERS
+
+            CHART_RENDERERS[job.kind](out_path=out, **job.params)
+    except Exception as e:
+        return job.key, None, f"{type(e).__name__}: {e}"
+    return job.key, job.out_path, None
+
+
+def warm_chart_worker(backend: str = "matplotlib") -> None:
+    """Pool initializer: pays the backend's import / font-cache start-up once per worker."""
+    if backend == "matplotlib":
+        importlib.import_module("src.render.charts").warm_figures()
+    else:
+        importlib.import_module("src.render.rl_charts")
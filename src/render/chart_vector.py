@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import base64
+import io
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from matplotlib.backend_bases import GraphicsContextBase, RendererBase
+from matplotlib.figure import Figure
+from matplotlib.font_manager import findfont
+from matplotlib.path import Path as MplPath
+
+# Vector chart "display list": the drawing operations of one matplotlib figure
+# in PDF points (origin bottom-left), replayed by src/render/pdf.py into a
+# ReportLab Form XObject. Recording needs matplotlib; replaying only uses its
+# font manager to find text fonts, which are stored by TTF file name rather
+# than path so cached charts replay the same on another machine.
+#
+#   {"version": 1, "bbox": [x0, y0, x1, y1], "ops": [
+#     {"op": "path", "d": ["M", x, y, "L", x, y, "C", x1, y1, x2, y2, x, y, "Z"],
+#      "fill": [r, g, b, a] | null, "stroke": [r, g, b, a] | null, "lw": w,
+#      "dash": [phase, [on, off, ...]] | null, "cap": ..., "join": ..., "clip": [x, y, w, h] | null},
+#     {"op": "text", "s": str, "x": x, "y": y, "angle": deg, "size": pt,
+#      "font": ttf file name, "color": [r, g, b, a], "clip": ...},
+#     {"op": "image", "png": base64, "x": x, "y": y, "w": w, "h": h, "clip": ...}
+#   ]}
+VECTOR_VERSION = 1
+_PAD_INCHES = 0.1  # same padding as savefig(bbox_inches="tight")
+
+
+def _r(v: float) -> float:
+    return round(float(v), 2)
+
+
+def _rgba(rgb: Sequence[float], alpha: Optional[float] = None) -> List[float]:
+    a = rgb[3] if alpha is None and len(rgb) > 3 else (1.0 if alpha is None else alpha)
+    return [round(float(c), 4) for c in rgb[:3]] + [round(float(a), 4)]
+
+
+class _RecordingRenderer(RendererBase):
+    """Minimal matplotlib renderer (72 dpi, y up) that records ops instead of drawing."""
+
+    def __init__(self, width: float, height: float) -> None:
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.ops: List[Dict[str, Any]] = []
+
+    def flipy(self) -> bool:
+        return False
+
+    def get_canvas_width_height(self):
+        return self.width, self.height
+
+    def points_to_pixels(self, points):
+        return points
+
+    def _clip(self, gc: GraphicsContextBase) -> Optional[List[float]]:
+        bbox = gc.get_clip_rectangle()
+        if bbox is None:
+            return None
+        return [_r(bbox.x0), _r(bbox.y0), _r(bbox.width), _r(bbox.height)]
+
+    def draw_path(self, gc, path, transform, rgbFace=None):
+        d: List[Any] = []
+        last = (0.0, 0.0)
+        simplify = path.should_simplify and rgbFace is None
+        for verts, code in path.iter_segments(transform, simplify=simplify, curves=True):
+            if code == MplPath.MOVETO:
+                d += ["M", _r(verts[0]), _r(verts[1])]
+            elif code == MplPath.LINETO:
+                d += ["L", _r(verts[0]), _r(verts[1])]
+            elif code == MplPath.CURVE3:
+                # quadratic -> cubic
+                qx, qy, x, y = verts
+                c1 = (last[0] + 2.0 / 3.0 * (qx - last[0]), last[1] + 2.0 / 3.0 * (qy - last[1]))
+                c2 = (x + 2.0 / 3.0 * (qx - x), y + 2.0 / 3.0 * (qy - y))
+                d += ["C", _r(c1[0]), _r(c1[1]), _r(c2[0]), _r(c2[1]), _r(x), _r(y)]
+            elif code == MplPath.CURVE4:
+                d += ["C", *(_r(v) for v in verts)]
+            elif code == MplPath.CLOSEPOLY:
+                d.append("Z")
+                continue
+            last = (float(verts[-2]), float(verts[-1]))
+        if not d:
+            return
+
+        fill = None
+        if rgbFace is not None:
+            fill = _rgba(rgbFace, gc.get_alpha() if gc.get_forced_alpha() else None)
+        lw = gc.get_linewidth()
+        stroke = _rgba(gc.get_rgb()) if lw > 0 else None
+        if stroke is not None and stroke[3] == 0:
+            stroke = None
+        if fill is None and stroke is None:
+            return
+
+        offset, dashes = gc.get_dashes()
+        self.ops.append({
+            "op": "path",
+            "d": d,
+            "fill": fill,
+            "stroke": stroke,
+            "lw": _r(lw),
+            "dash": [_r(offset or 0), [_r(v) for v in dashes]] if dashes else None,
+            "cap": gc.get_capstyle(),
+            "join": gc.get_joinstyle(),
+            "clip": self._clip(gc),
+        })
+
+    def draw_text(self, gc, x, y, s, prop, angle, ismath=False, mtext=None):
+        font = findfont(prop)
+        if ismath or not font.lower().endswith(".ttf"):
+            self._draw_text_as_path(gc, x, y, s, prop, angle, ismath)
+            return
+        self.ops.append({
+            "op": "text",
+            "s": s,
+            "x": _r(x),
+            "y": _r(y),
+            "angle": _r(angle),
+            "size": _r(prop.get_size_in_points()),
+            "font": Path(font).name,
+            "color": _rgba(gc.get_rgb()),
+            "clip": self._clip(gc),
+        })
+
+    def draw_image(self, gc, x, y, im, transform=None):
+        from PIL import Image
+
+        buf = io.BytesIO()
+        Image.fromarray(im).save(buf, format="PNG")
+        h, w = im.shape[:2]
+        self.ops.append({
+            "op": "image",
+            "png": base64.b64encode(buf.getvalue()).decode("ascii"),
+            "x": _r(x),
+            "y": _r(y),
+            "w": w,
+            "h": h,
+            "clip": self._clip(gc),
+        })
+
+
+def record_figure(fig: Figure) -> Dict[str, Any]:
+    """Laid-out figure -> display list, cropped like bbox_inches="tight"."""
+    dpi = fig.dpi
+    try:
+        fig.set_dpi(72)
+        w_in, h_in = fig.get_size_inches()
+        tight = fig.get_tightbbox(fig.canvas.get_renderer()).padded(_PAD_INCHES)
+        rec = _RecordingRenderer(w_in * 72.0, h_in * 72.0)
+        fig.draw(rec)
+    finally:
+        fig.set_dpi(dpi)
+    return {
+        "version": VECTOR_VERSION,
+        "bbox": [_r(tight.x0 * 72), _r(tight.y0 * 72), _r(tight.x1 * 72), _r(tight.y1 * 72)],
+        "ops": rec.ops,
+    }
+
+
+def save_vector(fig: Figure, out_path: Path) -> None:
+    out_path.write_text(json.dumps(record_figure(fig), ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
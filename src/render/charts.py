@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Tuple
 
-import matplotlib.pyplot as plt
+import matplotlib
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
+from src.render.chart_jobs import CHART_DOC_SUFFIX, CHART_DPI, CHART_FIGSIZES
+from src.render.chart_vector import save_vector
 from src.utils.money import parse_inr_compact
 
 
@@ -15,11 +22,73 @@ class ChartResult:
     path: str
 
 
-def _save_fig(out_path: Path) -> None:
+# -----------------------
+# Figure pool
+# -----------------------
+_SUBPLOT_PARAMS = ("left", "right", "bottom", "top", "wspace", "hspace")
+
+
+class FigurePool:
+    """
+    Reusable Agg figures, keyed by figsize. No pyplot state is involved:
+    every chart draws on its own Figure, so charts can render concurrently
+    from several threads. A released figure is cleared and handed to the
+    next chart of the same size instead of building a new one.
+    """
+
+    def __init__(self, max_per_size: int = 4) -> None:
+        self.max_per_size = max_per_size
+        self._free: Dict[Tuple[float, float], List[Figure]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, figsize: Tuple[float, float]) -> Figure:
+        with self._lock:
+            free = self._free.get(figsize)
+            if free:
+                return free.pop()
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        return fig
+
+    def release(self, fig: Figure) -> None:
+        fig.clear()
+        # tight_layout moves the subplot params; start the next chart from rcParams
+        fig.subplotpars.update(**{k: matplotlib.rcParams[f"figure.subplot.{k}"] for k in _SUBPLOT_PARAMS})
+        w, h = fig.get_size_inches()
+        figsize = (float(w), float(h))
+        with self._lock:
+            free = self._free.setdefault(figsize, [])
+            if len(free) < self.max_per_size:
+                free.append(fig)
+
+
+FIGURE_POOL = FigurePool()
+
+
+@contextmanager
+def _axes(figsize: Tuple[float, float]) -> Iterator[Axes]:
+    fig = FIGURE_POOL.acquire(figsize)
+    try:
+        yield fig.add_subplot()
+    finally:
+        FIGURE_POOL.release(fig)
+
+
+def _rotate_xticks(ax: Axes) -> None:
+    for label in ax.get_xticklabels():
+        label.set_rotation(20)
+        label.set_horizontalalignment("right")
+
+
+def _save_fig(ax: Axes, out_path: Path) -> None:
+    """PNG at CHART_DPI, or a vector display list when out_path ends in CHART_DOC_SUFFIX."""
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    plt.tight_layout()
-    plt.savefig(out_path, dpi=200, bbox_inches="tight")
-    plt.close()
+    fig = ax.get_figure()
+    fig.tight_layout()
+    if out_path.suffix == CHART_DOC_SUFFIX:
+        save_vector(fig, out_path)
+    else:
+        fig.savefig(out_path, dpi=CHART_DPI, bbox_inches="tight")
 
 
 def chart_price_trend(points: List[Dict[str, Any]], out_path: Path) -> None:
@@ -29,15 +98,15 @@ def chart_price_trend(points: List[Dict[str, Any]], out_path: Path) -> None:
     y1 = [float(p.get("locationRate") or 0.0) for p in pts]
     y2 = [float(p.get("micromarketRate") or 0.0) for p in pts]
 
-    plt.figure(figsize=(8, 3.5))
-    plt.plot(x, y1, marker="o")
-    plt.plot(x, y2, marker="o")
-    plt.title("Asking Price Trend (Locality vs Micro-market)")
-    plt.xlabel("Quarter")
-    plt.ylabel("Rate (₹/sq ft)")
-    plt.grid(True, alpha=0.2)
-    plt.legend(["Locality", "Micro-market"])
-    _save_fig(out_path)
+    with _axes(CHART_FIGSIZES["price_trend"]) as ax:
+        ax.plot(x, y1, marker="o")
+        ax.plot(x, y2, marker="o")
+        ax.set_title("Asking Price Trend (Locality vs Micro-market)")
+        ax.set_xlabel("Quarter")
+        ax.set_ylabel("Rate (₹/sq ft)")
+        ax.grid(True, alpha=0.2)
+        ax.legend(["Locality", "Micro-market"])
+        _save_fig(ax, out_path)
 
 
 def chart_histogram_buckets(graph_data: List[Dict[str, Any]], out_path: Path) -> None:
@@ -45,27 +114,27 @@ def chart_histogram_buckets(graph_data: List[Dict[str, Any]], out_path: Path) ->
     buckets = [d.get("bucketRange", "") for d in graph_data]
     counts = [int(d.get("saleCount") or 0) for d in graph_data]
 
-    plt.figure(figsize=(8, 3.5))
-    plt.bar(buckets, counts)
-    plt.title("Market Supply Distribution (Listing Rate Buckets)")
-    plt.xlabel("₹/sq ft bucket")
-    plt.ylabel("Listings")
-    plt.xticks(rotation=20, ha="right")
-    plt.grid(True, axis="y", alpha=0.2)
-    _save_fig(out_path)
+    with _axes(CHART_FIGSIZES["histogram_buckets"]) as ax:
+        ax.bar(buckets, counts)
+        ax.set_title("Market Supply Distribution (Listing Rate Buckets)")
+        ax.set_xlabel("₹/sq ft bucket")
+        ax.set_ylabel("Listings")
+        _rotate_xticks(ax)
+        ax.grid(True, axis="y", alpha=0.2)
+        _save_fig(ax, out_path)
 
 
 def chart_rent_by_bhk(rental_bhk_stats: List[Dict[str, Any]], out_path: Path) -> None:
     labels = [d.get("unitType", "") for d in rental_bhk_stats]
     values = [parse_inr_compact(d.get("avgRate")) or 0.0 for d in rental_bhk_stats]
 
-    plt.figure(figsize=(8, 3.5))
-    plt.bar(labels, values)
-    plt.title("Average Monthly Rent by Unit Type")
-    plt.xlabel("Unit Type")
-    plt.ylabel("Monthly rent (₹)")
-    plt.grid(True, axis="y", alpha=0.2)
-    _save_fig(out_path)
+    with _axes(CHART_FIGSIZES["rent_by_bhk"]) as ax:
+        ax.bar(labels, values)
+        ax.set_title("Average Monthly Rent by Unit Type")
+        ax.set_xlabel("Unit Type")
+        ax.set_ylabel("Monthly rent (₹)")
+        ax.grid(True, axis="y", alpha=0.2)
+        _save_fig(ax, out_path)
 
 
 def chart_nearby_rates(location_rates: List[Dict[str, Any]], out_path: Path, max_n: int = 10) -> None:
@@ -83,12 +152,12 @@ def chart_nearby_rates(location_rates: List[Dict[str, Any]], out_path: Path, max
     names = [x[0] for x in rows]
     vals = [x[1] for x in rows]
 
-    plt.figure(figsize=(8, 4.0))
-    plt.barh(names[::-1], vals[::-1])
-    plt.title("Locality vs Nearby Localities (Avg Rate)")
-    plt.xlabel("Rate (₹/sq ft)")
-    plt.grid(True, axis="x", alpha=0.2)
-    _save_fig(out_path)
+    with _axes(CHART_FIGSIZES["nearby_rates"]) as ax:
+        ax.barh(names[::-1], vals[::-1])
+        ax.set_title("Locality vs Nearby Localities (Avg Rate)")
+        ax.set_xlabel("Rate (₹/sq ft)")
+        ax.grid(True, axis="x", alpha=0.2)
+        _save_fig(ax, out_path)
 
 
 def chart_dual_gap_bars(
@@ -106,16 +175,17 @@ def chart_dual_gap_bars(
     x = list(range(len(labels)))
     width = 0.4
 
-    plt.figure(figsize=(9, 3.8))
-    plt.bar([v - width / 2 for v in x], demand, width=width)
-    plt.bar([v + width / 2 for v in x], supply, width=width)
-    plt.title(title)
-    plt.xlabel("Segment")
-    plt.ylabel("Share (%)")
-    plt.xticks(x, labels, rotation=20, ha="right")
-    plt.legend(["Demand %", "Supply %"])
-    plt.grid(True, axis="y", alpha=0.2)
-    _save_fig(out_path)
+    with _axes(CHART_FIGSIZES["dual_gap_bars"]) as ax:
+        ax.bar([v - width / 2 for v in x], demand, width=width)
+        ax.bar([v + width / 2 for v in x], supply, width=width)
+        ax.set_title(title)
+        ax.set_xlabel("Segment")
+        ax.set_ylabel("Share (%)")
+        ax.set_xticks(x, labels)
+        _rotate_xticks(ax)
+        ax.legend(["Demand %", "Supply %"])
+        ax.grid(True, axis="y", alpha=0.2)
+        _save_fig(ax, out_path)
 
 
 def chart_simple_bar(
@@ -127,12 +197,31 @@ def chart_simple_bar(
     ylabel: str,
     rotate: bool = True,
 ) -> None:
-    plt.figure(figsize=(9, 3.8))
-    plt.bar(labels, values)
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    if rotate:
-        plt.xticks(rotation=20, ha="right")
-    plt.grid(True, axis="y", alpha=0.2)
-    _save_fig(out_path)
\ No newline at end of file
+    with _axes(CHART_FIGSIZES["simple_bar"]) as ax:
+        ax.bar(labels, values)
+        ax.set_title(title)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        if rotate:
+            _rotate_xticks(ax)
+        ax.grid(True, axis="y", alpha=0.2)
+        _save_fig(ax, out_path)
+
+
+# -----------------------
+# Chart jobs (see src/render/chart_jobs.py)
+# -----------------------
+CHART_RENDERERS: Dict[str, Callable[..., None]] = {
+    "price_trend": chart_price_trend,
+    "histogram_buckets": chart_histogram_buckets,
+    "rent_by_bhk": chart_rent_by_bhk,
+    "nearby_rates": chart_nearby_rates,
+    "dual_gap_bars": chart_dual_gap_bars,
+    "simple_bar": chart_simple_bar,
+}
+
+
+def warm_figures() -> None:
+    """Pays the font-cache / Agg start-up once (pool worker initializer)."""
+    with _axes((1, 1)) as ax:
+        ax.get_figure().canvas.draw()
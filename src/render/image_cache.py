@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Hashable, Tuple
+
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+
+@dataclass(frozen=True)
+class CachedImage:
+    """One decoded image and its pixel size."""
+    reader: ImageReader
+    width: int
+    height: int
+
+
+class ImageCache:
+    """
+    Process-wide decoded images for render_pdf, keyed by path + inode + mtime +
+    size, so sequential render_pdf calls in one worker (batch runs, draft +
+    final PDF) never decode the same chart twice. Drawing goes through the
+    public canvas.drawImage, which embeds each image once per document.
+    Least recently used entries are dropped beyond max_entries.
+    """
+
+    def __init__(self, max_entries: int = 128) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedImage]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, key: Hashable, source: Any) -> CachedImage:
+        with self._lock:
+            img = self._entries.get(key)
+            if img is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return img
+        reader = ImageReader(source)
+        width, height = reader.getSize()
+        img = CachedImage(reader=reader, width=width, height=height)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = img
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return img
+
+    def get_file(self, path: Path) -> CachedImage:
+        p = Path(path).resolve()
+        st = p.stat()
+        return self._load((str(p), st.st_ino, st.st_mtime_ns, st.st_size), str(p))
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+IMAGE_CACHE = ImageCache()
+
+
+def draw_cached_image(
+    c: canvas.Canvas,
+    img: CachedImage,
+    x: float,
+    y: float,
+    width: float,
+    height: float,
+    preserve_aspect: bool = True,
+    anchor: str = "c",
+) -> Tuple[float, float]:
+    """c.drawImage for a cached image; returns its pixel size."""
+    c.drawImage(img.reader, x, y, width, height, mask=None, preserveAspectRatio=preserve_aspect, anchor=anchor)
+    return img.width, img.height
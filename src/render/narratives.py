@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Narrative index: every narrative the payload carries, resolved once into
+# (page_key, field) -> value. Step 5 and older payloads put narratives in
+# several places; lookup order (first hit wins) is
+#   1. payload[page]["narrative"][field]
+#   2. payload["narratives"][page][field]
+#   3. payload["narratives"]["<page>.<field>"]
+#   4. payload[page]["computed"]["narratives" | "narrative"][field]
+#   5. payload[page]["computed"][field]
+# Strings and bullet lists resolve independently (a field may be text in one place
+# and bullets in another), so a lookup of either kind matches the old probing.
+
+
+def strip_html_to_text(html: str) -> str:
+    """
+    Minimal HTML->text for PDF.
+    Converts list items to bullets and strips other tags.
+    """
+    s = html or ""
+    s = s.replace("</li>", "\n")
+    s = s.replace("<li>", "- ")
+    for tag in ["<ul>", "</ul>", "<ol>", "</ol>", "<p>", "</p>"]:
+        s = s.replace(tag, "\n")
+    for tag in ["<br>", "<br/>", "<br />"]:
+        s = s.replace(tag, "\n")
+
+    out = []
+    in_tag = False
+    for ch in s:
+        if ch == "<":
+            in_tag = True
+            continue
+        if ch == ">":
+            in_tag = False
+            continue
+        if not in_tag:
+            out.append(ch)
+
+    txt = "".join(out)
+    lines = [ln.strip() for ln in txt.splitlines()]
+    lines = [ln for ln in lines if ln]
+    return "\n".join(lines).strip()
+
+
+def _sources(payload: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(page_key, {field: value}) in lookup order, highest priority first."""
+    narratives = payload.get("narratives") or {}
+    if not isinstance(narratives, dict):
+        narratives = {}
+
+    pages = [k for k, v in payload.items() if k.startswith("page") and isinstance(v, dict)]
+    for k, v in narratives.items():
+        if isinstance(v, dict) and k not in pages:
+            pages.append(k)
+
+    flat: Dict[str, Dict[str, Any]] = {}
+    for k, v in narratives.items():
+        if "." in k:
+            page_key, fld = k.split(".", 1)
+            flat.setdefault(page_key, {})[fld] = v
+
+    for page_key in pages:
+        page = payload.get(page_key) or {}
+        if not isinstance(page, dict):
+            page = {}
+        comp = page.get("computed") or {}
+        if not isinstance(comp, dict):
+            comp = {}
+        for src in (
+            page.get("narrative") or {},
+            narratives.get(page_key),
+            flat.get(page_key),
+            comp.get("narratives") or comp.get("narrative") or {},
+            comp,
+        ):
+            if isinstance(src, dict):
+                yield page_key, src
+    for page_key, src in flat.items():
+        if page_key not in pages:
+            yield page_key, src
+
+
+@dataclass
+class NarrativeIndex:
+    """Flat (page_key, field) -> plain text (HTML stripped) / bullet list. O(1) lookups."""
+
+    texts: Dict[Tuple[str, str], str] = field(default_factory=dict)
+    lists: Dict[Tuple[str, str], List[str]] = field(default_factory=dict)
+
+    def text(self, page_key: str, fld: str) -> str:
+        return self.texts.get((page_key, fld), "")
+
+    def items(self, page_key: str, fld: str) -> List[str]:
+        return list(self.lists.get((page_key, fld), ()))
+
+    def to_json(self) -> Dict[str, Dict[str, Any]]:
+        """{page_key: {field: text | [items]}} for the UI export (text wins when a field has both)."""
+        out: Dict[str, Dict[str, Any]] = {}
+        for (page_key, fld), items in self.lists.items():
+            out.setdefault(page_key, {})[fld] = items
+        for (page_key, fld), text in self.texts.items():
+            out.setdefault(page_key, {})[fld] = text
+        return out
+
+
+def build_narrative_index(payload: Dict[str, Any]) -> NarrativeIndex:
+    idx = NarrativeIndex()
+    for page_key, src in _sources(payload):
+        for fld, v in src.items():
+            key = (page_key, fld)
+            if isinstance(v, str):
+                if key not in idx.texts:
+                    idx.texts[key] = strip_html_to_text(v)
+            elif isinstance(v, list) and not any(isinstance(x, (dict, list)) for x in v):
+                # bullets only; lists of records in computed are chart/table data
+                if key not in idx.lists:
+                    idx.lists[key] = [str(x).strip() for x in v if str(x).strip()]
+    return idx
@@ -1,14 +1,27 @@
 from __future__ import annotations
 
+import base64
+import hashlib
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
 
+from src.render.chart_jobs import CHART_DOC_SUFFIX
+from src.render.image_cache import IMAGE_CACHE, draw_cached_image
+from src.render.narratives import NarrativeIndex, build_narrative_index
+from src.render.rl_charts import draw_chart_spec
+from src.render.text_layout import wrap_text
+
 
 PAGE_W, PAGE_H = A4
 M = 36  # margin
@@ -48,120 +61,12 @@ def _pick(d: Dict[str, Any], path: str, default: Any = None) -> Any:
     return cur
 
 
-def _strip_html_to_text(html: str) -> str:
-    """
-    Minimal HTML->text for PDF.
-    Converts list items to bullets and strips other tags.
-    """
-    s = html or ""
-    s = s.replace("</li>", "\n")
-    s = s.replace("<li>", "- ")
-    for tag in ["<ul>", "</ul>", "<ol>", "</ol>", "<p>", "</p>"]:
-        s = s.replace(tag, "\n")
-    for tag in ["<br>", "<br/>", "<br />"]:
-        s = s.replace(tag, "\n")
-
-    out = []
-    in_tag = False
-    for ch in s:
-        if ch == "<":
-            in_tag = True
-            continue
-        if ch == ">":
-            in_tag = False
-            continue
-        if not in_tag:
-            out.append(ch)
-
-    txt = "".join(out)
-    lines = [ln.strip() for ln in txt.splitlines()]
-    lines = [ln for ln in lines if ln]
-    return "\n".join(lines).strip()
-
-
-def _wrap_lines(c: canvas.Canvas, text: str, max_w: float, font: str, size: int) -> List[str]:
-    words = (text or "").split()
-    if not words:
-        return []
-    lines: List[str] = []
-    cur = words[0]
-    for w in words[1:]:
-        cand = cur + " " + w
-        if c.stringWidth(cand, font, size) <= max_w:
-            cur = cand
-        else:
-            lines.append(cur)
-            cur = w
-    lines.append(cur)
-    return lines
-
-
-def _get_narrative(payload: Dict[str, Any], page_key: str, key: str) -> str:
-    """
-    Finds narrative string in multiple supported locations.
-    """
-    # 0) Preferred: page-level narrative object written by Step-5
-    page = payload.get(page_key) or {}
-    if isinstance(page, dict):
-        n0 = page.get("narrative") or {}
-        if isinstance(n0, dict) and isinstance(n0.get(key), str):
-            return n0[key].strip()
-
-    n = payload.get("narratives") or {}
-    if isinstance(n, dict):
-        v = n.get(page_key)
-        if isinstance(v, dict) and isinstance(v.get(key), str):
-            return v[key].strip()
-        flat = n.get(f"{page_key}.{key}")
-        if isinstance(flat, str):
-            return flat.strip()
-
-    if isinstance(page, dict):
-        comp = page.get("computed") or {}
-        if isinstance(comp, dict):
-            nn = comp.get("narratives") or comp.get("narrative") or {}
-            if isinstance(nn, dict) and isinstance(nn.get(key), str):
-                return nn[key].strip()
-            if isinstance(comp.get(key), str):
-                return comp[key].strip()
-
-    return ""
-
-
-def _get_narrative_list(payload: Dict[str, Any], page_key: str, key: str) -> List[str]:
-    """Return a list narrative (bullets) from supported locations."""
-    page = payload.get(page_key) or {}
-    if isinstance(page, dict):
-        n0 = page.get("narrative") or {}
-        if isinstance(n0, dict) and isinstance(n0.get(key), list):
-            return [str(x).strip() for x in n0.get(key) if str(x).strip()]
-
-    n = payload.get("narratives") or {}
-    if isinstance(n, dict):
-        v = n.get(page_key)
-        if isinstance(v, dict) and isinstance(v.get(key), list):
-            return [str(x).strip() for x in v.get(key) if str(x).strip()]
-        flat = n.get(f"{page_key}.{key}")
-        if isinstance(flat, list):
-            return [str(x).strip() for x in flat if str(x).strip()]
-
-    # Back-compat: computed container
-    if isinstance(page, dict):
-        comp = page.get("computed") or {}
-        if isinstance(comp, dict):
-            nn = comp.get("narratives") or comp.get("narrative") or {}
-            if isinstance(nn, dict) and isinstance(nn.get(key), list):
-                return [str(x).strip() for x in nn.get(key) if str(x).strip()]
-            if isinstance(comp.get(key), list):
-                return [str(x).strip() for x in comp.get(key) if str(x).strip()]
-
-    return []
-
-
 # -----------------------
 # Drawing primitives
 # -----------------------
 def _draw_header(c: canvas.Canvas, title: str, page_no: int) -> None:
+    if isinstance(c, _BookCanvas):
+        page_no = c.getPageNumber()  # numbered across the whole book, like its contents
     c.setFillColor(colors.black)
     c.setFont(FONT_BOLD, 12)
     c.drawString(M, PAGE_H - M + 6, title)
@@ -200,7 +105,7 @@ def _draw_paragraph(
 ) -> float:
     c.setFillColor(colors.HexColor("#111827"))
     c.setFont(FONT_BODY, font_size)
-    lines = _wrap_lines(c, text or "", w, FONT_BODY, font_size)
+    lines = wrap_text(text or "", w, FONT_BODY, font_size)
     if max_lines is not None:
         lines = lines[:max_lines]
     cur_y = y
@@ -228,7 +133,7 @@ def _draw_bullets(
         it = (it or "").strip()
         if not it:
             continue
-        wrapped = _wrap_lines(c, f"• {it}", w, FONT_BODY, font_size)
+        wrapped = wrap_text(f"• {it}", w, FONT_BODY, font_size)
         for ln in wrapped:
             c.setFont(FONT_BODY, font_size)
             c.setFillColor(colors.HexColor("#111827"))
@@ -255,8 +160,142 @@ def _draw_image_box(c: canvas.Canvas, x: float, y: float, w: float, h: float, im
         c.drawString(x + 12, y + h / 2, "Chart file missing")
         return
 
-    img = ImageReader(str(p))
-    c.drawImage(img, x + 10, y + 10, w - 20, h - 20, preserveAspectRatio=True, anchor="c")
+    if p.suffix == CHART_DOC_SUFFIX:
+        try:
+            _draw_chart_doc(c, x + 10, y + 10, w - 20, h - 20, p)
+        except Exception:
+            c.setFillColor(colors.HexColor("#6B7280"))
+            c.setFont(FONT_BODY, 9)
+            c.drawString(x + 12, y + h / 2, "Chart not available")
+        return
+
+    draw_cached_image(c, IMAGE_CACHE.get_file(p), x + 10, y + 10, w - 20, h - 20)
+
+
+# -----------------------
+# Chart documents: vector display lists (src/render/chart_vector.py)
+# and native chart specs (src/render/rl_charts.py)
+# -----------------------
+_LINE_CAPS = {"butt": 0, "round": 1, "projecting": 2}
+_LINE_JOINS = {"miter": 0, "round": 1, "bevel": 2}
+_CHART_FONTS: Dict[str, str] = {}  # display-list font -> registered ReportLab font name
+
+
+def _chart_ttf(font: str) -> Optional[str]:
+    """
+    TTF file for a display-list font: its basename, looked up in this machine's
+    matplotlib font manager (older display lists hold a full path, used as-is
+    when it still exists).
+    """
+    p = Path(font)
+    if p.is_absolute() and p.exists():
+        return str(p)
+    try:
+        from matplotlib import font_manager
+    except ImportError:
+        return None
+    for entry in font_manager.fontManager.ttflist:
+        if Path(entry.fname).name == p.name:
+            return entry.fname
+    return None
+
+
+def _chart_font(font: str) -> str:
+    name = _CHART_FONTS.get(font)
+    if name is None:
+        name = FONT_BODY
+        path = _chart_ttf(font) if font else None
+        if path is not None:
+            name = f"Chart-{Path(path).stem}"
+            if name not in pdfmetrics.getRegisteredFontNames():
+                pdfmetrics.registerFont(TTFont(name, path))
+        _CHART_FONTS[font] = name
+    return name
+
+
+def _replay_vector_ops(c: canvas.Canvas, ops: List[Dict[str, Any]]) -> None:
+    for op in ops:
+        c.saveState()
+        clip = op.get("clip")
+        if clip:
+            cp = c.beginPath()
+            cp.rect(*clip)
+            c.clipPath(cp, stroke=0, fill=0)
+
+        kind = op.get("op")
+        if kind == "path":
+            path = c.beginPath()
+            d = op["d"]
+            i = 0
+            while i < len(d):
+                cmd = d[i]
+                if cmd == "M":
+                    path.moveTo(d[i + 1], d[i + 2])
+                    i += 3
+                elif cmd == "L":
+                    path.lineTo(d[i + 1], d[i + 2])
+                    i += 3
+                elif cmd == "C":
+                    path.curveTo(*d[i + 1 : i + 7])
+                    i += 7
+                else:  # "Z"
+                    path.close()
+                    i += 1
+            fill, stroke = op.get("fill"), op.get("stroke")
+            if fill:
+                c.setFillColorRGB(*fill[:3], alpha=fill[3])
+            if stroke:
+                c.setStrokeColorRGB(*stroke[:3], alpha=stroke[3])
+                c.setLineWidth(op.get("lw", 1))
+                c.setLineCap(_LINE_CAPS.get(op.get("cap"), 0))
+                c.setLineJoin(_LINE_JOINS.get(op.get("join"), 0))
+                if op.get("dash"):
+                    phase, dashes = op["dash"]
+                    c.setDash(dashes, phase)
+            c.drawPath(path, stroke=1 if stroke else 0, fill=1 if fill else 0, fillMode=canvas.FILL_NON_ZERO)
+        elif kind == "text":
+            color = op.get("color") or [0, 0, 0, 1]
+            c.translate(op["x"], op["y"])
+            c.rotate(op.get("angle", 0))
+            c.setFillColorRGB(*color[:3], alpha=color[3])
+            c.setFont(_chart_font(op.get("font", "")), op.get("size", 10))
+            c.drawString(0, 0, op["s"])
+        elif kind == "image":
+            img = ImageReader(io.BytesIO(base64.b64decode(op["png"])))
+            c.drawImage(img, op["x"], op["y"], op["w"], op["h"], mask="auto")
+        c.restoreState()
+
+
+def _draw_chart_doc(c: canvas.Canvas, x: float, y: float, w: float, h: float, p: Path) -> None:
+    doc = json.loads(p.read_text(encoding="utf-8"))
+    if "chart" in doc:
+        c.saveState()
+        draw_chart_spec(c, doc, x, y, w, h)
+        c.restoreState()
+    else:
+        _draw_vector_chart(c, x, y, w, h, p, doc)
+
+
+def _draw_vector_chart(c: canvas.Canvas, x: float, y: float, w: float, h: float, p: Path, vec: Dict[str, Any]) -> None:
+    """Draws a display list into (x, y, w, h) as a Form XObject, aspect-preserving and centered."""
+    x0, y0, x1, y1 = vec["bbox"]
+    bw, bh = x1 - x0, y1 - y0
+    if bw <= 0 or bh <= 0:
+        return
+
+    name = "chart-" + hashlib.sha1(str(p.resolve()).encode("utf-8")).hexdigest()[:16]
+    if not c.hasForm(name):
+        c.beginForm(name, lowerx=x0, lowery=y0, upperx=x1, uppery=y1)
+        _replay_vector_ops(c, vec.get("ops") or [])
+        c.endForm()
+
+    scale = min(w / bw, h / bh)
+    c.saveState()
+    c.translate(x + (w - bw * scale) / 2.0, y + (h - bh * scale) / 2.0)
+    c.scale(scale, scale)
+    c.translate(-x0, -y0)
+    c.doForm(name)
+    c.restoreState()
 
 
 # -----------------------
@@ -273,6 +312,62 @@ class TableSpec:
     grid: colors.Color = colors.HexColor("#D9DDE3")
 
 
+def _place_form(
+    c: canvas.Canvas, name: str, x: float, y: float, bbox: Tuple[float, float, float, float], build: Callable[[], None]
+) -> None:
+    """
+    Defines form `name` on its first use in this document (build() draws it at
+    the origin), then places it at (x, y). Leaves the canvas state as it was.
+    """
+    c.saveState()
+    if not c.hasForm(name):
+        c.beginForm(name, *bbox)
+        build()
+        c.endForm()
+    c.translate(x, y)
+    c.doForm(name)
+    c.restoreState()
+
+
+def _table_chrome(c: canvas.Canvas, w: float, spec: TableSpec, n_rows: int) -> None:
+    """Header fill + labels, row stripes and row rules for n_rows, with (x, y_top) at the origin."""
+    col_w = spec.col_widths
+
+    # header
+    c.setFillColor(spec.header_fill)
+    c.rect(0, -spec.row_h, w, spec.row_h, fill=1, stroke=0)
+
+    c.setFillColor(colors.HexColor("#111827"))
+    c.setFont(FONT_BOLD, spec.font_size)
+    cx = 0.0
+    for i, h in enumerate(spec.headers):
+        c.drawString(cx + 6, -spec.row_h + 6, _s(h)[:60])
+        cx += col_w[i]
+
+    c.setStrokeColor(spec.grid)
+    c.line(0, -spec.row_h, w, -spec.row_h)
+
+    cur_y = -spec.row_h
+    for r_i in range(n_rows):
+        cur_y -= spec.row_h
+        fill = colors.white if r_i % 2 == 0 else spec.row_alt_fill
+        c.setFillColor(fill)
+        c.rect(0, cur_y, w, spec.row_h, fill=1, stroke=0)
+        c.setStrokeColor(spec.grid)
+        c.line(0, cur_y, w, cur_y)
+
+
+def _table_grid(c: canvas.Canvas, spec: TableSpec, n_rows: int) -> None:
+    """Vertical grid lines for n_rows, with (x, y_top) at the origin; drawn over the cell text."""
+    bottom = -(n_rows + 1) * spec.row_h
+    cx = 0.0
+    c.setStrokeColor(spec.grid)
+    c.line(0, 0, 0, bottom)
+    for cw in spec.col_widths:
+        cx += cw
+        c.line(cx, 0, cx, bottom)
+
+
 def _draw_table(
     c: canvas.Canvas,
     x: float,
@@ -284,38 +379,31 @@ def _draw_table(
 ) -> float:
     """
     Draw table from y_top downward. Returns y_bottom.
+    The header and stripes, and the vertical grid drawn over the cell text,
+    are two forms shared by every table with the same spec, width and row
+    count; only the cell text is drawn per table.
     """
     col_w = spec.col_widths
     if sum(col_w) > w + 1e-6:
         raise ValueError("col_widths exceed table width")
 
-    # header
-    c.setFillColor(spec.header_fill)
-    c.rect(x, y_top - spec.row_h, w, spec.row_h, fill=1, stroke=0)
-
-    c.setFillColor(colors.HexColor("#111827"))
-    c.setFont(FONT_BOLD, spec.font_size)
-    cx = x
-    for i, h in enumerate(spec.headers):
-        c.drawString(cx + 6, y_top - spec.row_h + 6, _s(h)[:60])
-        cx += col_w[i]
-
-    c.setStrokeColor(spec.grid)
-    c.line(x, y_top - spec.row_h, x + w, y_top - spec.row_h)
-
-    cur_y = y_top - spec.row_h
     take = list(rows)
     if max_rows is not None:
         take = take[:max_rows]
 
-    for r_i, row in enumerate(take):
-        cur_y -= spec.row_h
-        fill = colors.white if r_i % 2 == 0 else spec.row_alt_fill
-        c.setFillColor(fill)
-        c.rect(x, cur_y, w, spec.row_h, fill=1, stroke=0)
+    n = len(take)
+    sig = repr((w, col_w, spec.row_h, spec.font_size, spec.headers,
+                spec.header_fill.hexval(), spec.row_alt_fill.hexval(), spec.grid.hexval(), n))
+    name = "table-" + hashlib.sha1(sig.encode("utf-8")).hexdigest()[:16]
+    bbox = (-1, -(n + 1) * spec.row_h - 1, w + 1, 1)
+    _place_form(c, name, x, y_top, bbox, lambda: _table_chrome(c, w, spec, n))
 
+    if take:
         c.setFillColor(colors.HexColor("#111827"))
         c.setFont(FONT_BODY, spec.font_size)
+    cur_y = y_top - spec.row_h
+    for row in take:
+        cur_y -= spec.row_h
         cx = x
         for i, cell in enumerate(row):
             txt = _s(cell)
@@ -326,31 +414,61 @@ def _draw_table(
             c.drawString(cx + 6, cur_y + 6, txt)
             cx += col_w[i]
 
-        c.setStrokeColor(spec.grid)
-        c.line(x, cur_y, x + w, cur_y)
-
-    # vertical grid
-    cx = x
-    c.setStrokeColor(spec.grid)
-    c.line(x, y_top, x, cur_y)
-    for cw in col_w:
-        cx += cw
-        c.line(cx, y_top, cx, cur_y)
-
+    _place_form(c, name + "-grid", x, y_top, bbox, lambda: _table_grid(c, spec, n))
     return cur_y
 
 
 # -----------------------
 # Main render
 # -----------------------
-def render_pdf(payload: Dict[str, Any], out_pdf: Path) -> None:
-    c = canvas.Canvas(str(out_pdf), pagesize=A4)
+def render_pdf(
+    payload: Dict[str, Any],
+    out_pdf: Union[Path, str, BinaryIO, None] = None,
+    page_workers: int = 1,
+) -> Optional[bytes]:
+    """
+    out_pdf: a path, any binary file-like sink with write() (BytesIO, pipe,
+    socket.makefile("wb"), an HTTP response body), or None to get the PDF back
+    as bytes. Sinks are written once, at the end, and left open.
+    page_workers > 1 draws contiguous groups of pages in worker processes and
+    merges the fragments (needs pypdf); 1 draws everything on one canvas.
+    """
+    if page_workers > 1:
+        pdf = _render_pages_parallel(payload, page_workers)
+        if out_pdf is None:
+            return pdf
+        if hasattr(out_pdf, "write"):
+            out_pdf.write(pdf)
+        else:
+            Path(out_pdf).write_bytes(pdf)
+        return None
 
-    p1 = payload.get("page1_cover")
-    if p1:
-        _render_page1_cover(c, payload, p1)
+    c = _open_canvas(out_pdf)
+    _draw_report(c, payload)
+    return _close_canvas(c, out_pdf)
 
-    for page_no, key, fn in [
+
+def _open_canvas(
+    out_pdf: Union[Path, str, BinaryIO, None], canvas_cls: Callable[..., canvas.Canvas] = canvas.Canvas
+) -> canvas.Canvas:
+    if out_pdf is None:
+        return canvas_cls("report.pdf", pagesize=A4)  # name is never opened: getpdfdata() in _close_canvas
+    if hasattr(out_pdf, "write"):
+        return canvas_cls(out_pdf, pagesize=A4)
+    return canvas_cls(str(out_pdf), pagesize=A4)
+
+
+def _close_canvas(c: canvas.Canvas, out_pdf: Union[Path, str, BinaryIO, None]) -> Optional[bytes]:
+    if out_pdf is None:
+        return c.getpdfdata()
+    c.save()
+    return None
+
+
+def _report_pages() -> List[Tuple[int, str, Callable[..., None]]]:
+    """(page number printed in the header, payload key, renderer) in document order."""
+    return [
+        (1, "page1_cover", lambda cc, pp, px, pn, nx: _render_page1_cover(cc, pp, px)),
         (2, "page2_exec_snapshot", _render_page2_exec),
         (3, "page3_liveability", _render_page3_liveability),
         (4, "page4_market_snapshot", _render_page4_market),
@@ -361,21 +479,236 @@ def render_pdf(payload: Dict[str, Any], out_pdf: Path) -> None:
         (7, "page6_nearby_comparison", _render_page6_nearby),
 
         # Demand supply after nearby
-        (8, "page7_demand_supply_sale", lambda cc, pp, px, pn: _render_page7_ds(cc, pp, px, pn, "sale")),
-        (9, "page8_demand_supply_rent", lambda cc, pp, px, pn: _render_page7_ds(cc, pp, px, pn, "rent")),
+        (8, "page7_demand_supply_sale", lambda cc, pp, px, pn, nx: _render_page7_ds(cc, pp, px, pn, nx, "sale")),
+        (9, "page8_demand_supply_rent", lambda cc, pp, px, pn, nx: _render_page7_ds(cc, pp, px, pn, nx, "rent")),
 
         # Keep price trend later if you want, or move earlier. I’m keeping it after DS:
         (10, "page5_price_trend", _render_page5_trend),
 
         (11, "page11_registrations_developers", _render_page11_regs_devs),
         (12, "page12_reviews_conclusion", _render_page12_reviews),
-    ]:
+    ]
+
+
+def _draw_report(c: canvas.Canvas, payload: Dict[str, Any], keys: Optional[Sequence[str]] = None) -> None:
+    """Draws the pages present in payload (only those in keys, if given) in document order."""
+    nx = build_narrative_index(payload)
+    started = False
+    for page_no, key, fn in _report_pages():
         px = payload.get(key)
-        if px:
+        if not px or (keys is not None and key not in keys):
+            continue
+        if started:
             c.showPage()
-            fn(c, payload, px, page_no)
+        fn(c, payload, px, page_no, nx)
+        started = True
+
+
+# -----------------------
+# City book: many localities in one document
+# -----------------------
+TOC_ROWS_PER_PAGE = 34
 
-    c.save()
+
+class _BookCanvas(canvas.Canvas):
+    """City book canvas: page headers show the page's number in the book, not in its report."""
+
+
+def report_page_count(payload: Dict[str, Any]) -> int:
+    """Pages payload's report has; 0 means render_city_book leaves it out."""
+    return sum(1 for _, key, _ in _report_pages() if payload.get(key))
+
+
+def _locality_name(payload: Dict[str, Any]) -> str:
+    meta = payload.get("meta", {}) or {}
+    cover = (payload.get("page1_cover", {}) or {}).get("data", {}) or {}
+    return _s(meta.get("locality") or cover.get("title"), "Locality")
+
+
+def _draw_toc(c: canvas.Canvas, title: str, entries: List[Tuple[str, int, str]], n_pages: int) -> None:
+    """Contents pages: one linked row per locality with its first book page."""
+    for page_i in range(n_pages):
+        if page_i:
+            c.showPage()
+        _draw_header(c, "Contents", page_i + 1)
+        y = PAGE_H - M - 40
+        if page_i == 0:
+            c.setFillColor(colors.HexColor("#111827"))
+            c.setFont(FONT_BOLD, 22)
+            c.drawString(M, y - 10, title)
+            y -= 50
+        for name, page, dest in entries[page_i * TOC_ROWS_PER_PAGE : (page_i + 1) * TOC_ROWS_PER_PAGE]:
+            c.setFillColor(colors.HexColor("#111827"))
+            c.setFont(FONT_BODY, 11)
+            c.drawString(M, y, name)
+            c.drawRightString(PAGE_W - M, y, str(page))
+            c.setStrokeColor(colors.HexColor("#D9DDE3"))
+            c.line(M, y - 5, PAGE_W - M, y - 5)
+            c.linkAbsolute("", dest, (M, y - 5, PAGE_W - M, y + 12))
+            y -= 20
+
+
+def render_city_book(
+    payloads: Sequence[Dict[str, Any]],
+    out_pdf: Union[Path, str, BinaryIO, None] = None,
+    title: str = "City Book",
+) -> Optional[bytes]:
+    """
+    Renders several locality payloads into one PDF: contents page(s) with links
+    and a PDF outline, then each locality's report in order (page headers are
+    numbered across the book, as in the contents). Everything is drawn on one canvas, so fonts,
+    table forms and any chart image shared between localities are embedded once.
+    out_pdf / return value: as render_pdf.
+    """
+    books = [(p, report_page_count(p)) for p in payloads]
+    books = [(p, n) for p, n in books if n]
+    toc_pages = max(1, -(-len(books) // TOC_ROWS_PER_PAGE))
+
+    entries: List[Tuple[str, int, str]] = []
+    page = toc_pages + 1
+    for i, (p, n) in enumerate(books):
+        entries.append((_locality_name(p), page, f"locality-{i}"))
+        page += n
+
+    c = _open_canvas(out_pdf, _BookCanvas)
+    c.setTitle(title)
+    c.bookmarkPage("contents")
+    c.addOutlineEntry("Contents", "contents", level=0)
+    _draw_toc(c, title, entries, toc_pages)
+    for (p, _), (name, _, dest) in zip(books, entries):
+        c.showPage()
+        c.bookmarkPage(dest)
+        c.addOutlineEntry(name, dest, level=0)
+        _draw_report(c, p)
+    c.showOutline()
+    return _close_canvas(c, out_pdf)
+
+
+# -----------------------
+# Page-parallel rendering
+# -----------------------
+_PAGE_POOL: Optional[ProcessPoolExecutor] = None
+_PAGE_POOL_SIZE = 0
+
+
+def _page_pool(workers: int) -> ProcessPoolExecutor:
+    """Process-wide pool of page renderers, reused across render_pdf calls (keeps their image caches warm)."""
+    global _PAGE_POOL, _PAGE_POOL_SIZE
+    if _PAGE_POOL is None or _PAGE_POOL_SIZE != workers:
+        if _PAGE_POOL is not None:
+            _PAGE_POOL.shutdown()
+        _PAGE_POOL = ProcessPoolExecutor(max_workers=workers)
+        _PAGE_POOL_SIZE = workers
+    return _PAGE_POOL
+
+
+def _render_fragment(payload: Dict[str, Any], keys: List[str]) -> bytes:
+    c = canvas.Canvas("fragment.pdf", pagesize=A4)
+    _draw_report(c, payload, keys)
+    return c.getpdfdata()
+
+
+def _pdf_digest(obj: Any, h: Any, skip: Tuple[str, ...] = ()) -> None:
+    """Feeds a resolved PDF object (streams by decoded content) into hash h."""
+    obj = obj.get_object()
+    if hasattr(obj, "get_data"):
+        h.update(b"S")
+        h.update(obj.get_data())
+    if hasattr(obj, "keys"):
+        for k in sorted(obj.keys()):
+            if k in skip or k in ("/Length", "/Filter", "/DecodeParms"):
+                continue
+            h.update(k.encode("latin-1"))
+            _pdf_digest(obj[k], h)
+    elif isinstance(obj, list):
+        h.update(b"[")
+        for x in obj:
+            _pdf_digest(x, h)
+    elif not hasattr(obj, "get_data"):
+        h.update(repr(obj).encode("utf-8"))
+
+
+def _font_key(font: Any) -> str:
+    # each fragment names its fonts /F1, /F2 ... in order of first use, so fonts are
+    # matched by content; /Name is only the fragment-local resource name
+    h = hashlib.sha1()
+    _pdf_digest(font, h, skip=("/Name",))
+    return h.hexdigest()
+
+
+def _merge_fragments(fragments: List[bytes]) -> bytes:
+    """Concatenates PDF fragments page by page; page content is copied as-is."""
+    from pypdf import PdfReader, PdfWriter
+    from pypdf.generic import NameObject
+
+    writer = PdfWriter()
+    metadata = None
+    for i, frag in enumerate(fragments):
+        reader = PdfReader(io.BytesIO(frag))
+        writer.append(reader)
+        if i == 0 and reader.metadata:
+            metadata = dict(reader.metadata)
+
+    # Every fragment embeds its own copy of the fonts and of any chart / table form
+    # it uses. Point all resource entries at the first copy; copying the pages into a
+    # fresh writer then leaves the unreferenced duplicates behind. ReportLab names
+    # XObjects by a digest of their content ("/FormXob.<md5>"), so those are matched
+    # by name; fonts by content. (compress_identical_objects would decode and hash
+    # every stream, and its orphan pass stops one level deep: fonts keep their
+    # FontFile streams.)
+    shared_x: Dict[str, Any] = {}
+    shared_f: Dict[str, Any] = {}
+    visited = set()
+
+    def dedupe(res: Any) -> None:
+        if res is None:
+            return
+        res = res.get_object()
+        if id(res) in visited:
+            return
+        visited.add(id(res))
+        fonts = res.get("/Font")
+        if fonts is not None:
+            fonts = fonts.get_object()
+            for name in list(fonts.keys()):
+                ref = fonts.raw_get(name)
+                first = shared_f.setdefault(_font_key(ref), ref)
+                if first != ref:
+                    fonts[NameObject(name)] = first
+        xobjs = res.get("/XObject")
+        if xobjs is not None:
+            xobjs = xobjs.get_object()
+            for name in list(xobjs.keys()):
+                ref = xobjs.raw_get(name)
+                first = shared_x.setdefault(name, ref)
+                if first != ref:
+                    xobjs[NameObject(name)] = first
+                else:
+                    dedupe(ref.get_object().get("/Resources"))  # forms carry their own fonts
+
+    for page in writer.pages:
+        dedupe(page.get("/Resources"))
+    buf = io.BytesIO()
+    writer.write(buf)
+
+    out = PdfWriter()
+    out.append(PdfReader(buf))
+    if metadata:
+        out.add_metadata(metadata)
+    buf = io.BytesIO()
+    out.write(buf)
+    return buf.getvalue()
+
+
+def _render_pages_parallel(payload: Dict[str, Any], workers: int) -> bytes:
+    keys = [key for _, key, _ in _report_pages() if payload.get(key)]
+    n = max(1, min(workers, len(keys)))
+    size = -(-len(keys) // n)  # ceil
+    groups = [keys[i : i + size] for i in range(0, len(keys), size)]
+    if len(groups) <= 1:
+        return _render_fragment(payload, keys)
+    fragments = list(_page_pool(len(groups)).map(_render_fragment, [payload] * len(groups), groups))
+    return _merge_fragments(fragments)
 
 
 # -----------------------
@@ -410,7 +743,7 @@ def _render_page1_cover(c: canvas.Canvas, payload: Dict[str, Any], p1: Dict[str,
     _draw_footer(c, "Generated by Square Yards - Automated Locality Report Engine")
 
 
-def _render_page2_exec(c: canvas.Canvas, payload: Dict[str, Any], p2: Dict[str, Any], page_no: int) -> None:
+def _render_page2_exec(c: canvas.Canvas, payload: Dict[str, Any], p2: Dict[str, Any], page_no: int, nx: NarrativeIndex) -> None:
     _draw_header(c, "Executive Summary Snapshot", page_no)
     d = p2.get("data", {}) or {}
 
@@ -442,14 +775,14 @@ def _render_page2_exec(c: canvas.Canvas, payload: Dict[str, Any], p2: Dict[str,
     _draw_image_box(c, M, 270, PAGE_W - 2 * M, 150, spark)
 
     # LLM narratives (Step-5) can be either a bullet list or HTML/text.
-    takeaways_list = _get_narrative_list(payload, "page2_exec_snapshot", "key_takeaways")
-    takeaways_html = _get_narrative(payload, "page2_exec_snapshot", "takeaways")
+    takeaways_list = nx.items("page2_exec_snapshot", "key_takeaways")
+    takeaways_text = nx.text("page2_exec_snapshot", "takeaways")
     c.setFont(FONT_BOLD, 12)
     c.drawString(M, 240, "Key Takeaways")
     if takeaways_list:
         _draw_bullets(c, M, 220, PAGE_W - 2 * M, takeaways_list, font_size=10, leading=14, max_items=5)
-    elif takeaways_html:
-        txt = _strip_html_to_text(takeaways_html)
+    elif takeaways_text:
+        txt = takeaways_text
         items = [ln[2:].strip() for ln in txt.splitlines() if ln.startswith("- ")]
         if items:
             _draw_bullets(c, M, 220, PAGE_W - 2 * M, items, font_size=10, leading=14, max_items=5)
@@ -461,7 +794,7 @@ def _render_page2_exec(c: canvas.Canvas, payload: Dict[str, Any], p2: Dict[str,
     _draw_footer(c, "Note: Demand% is a behavioral signal, not confirmed market demand.")
 
 
-def _render_page3_liveability(c: canvas.Canvas, payload: Dict[str, Any], p3: Dict[str, Any], page_no: int) -> None:
+def _render_page3_liveability(c: canvas.Canvas, payload: Dict[str, Any], p3: Dict[str, Any], page_no: int, nx: NarrativeIndex) -> None:
     _draw_header(c, "Locality Profile & Liveability Indices", page_no)
     d = p3.get("data", {}) or {}
 
@@ -502,11 +835,11 @@ def _render_page3_liveability(c: canvas.Canvas, payload: Dict[str, Any], p3: Dic
         c.drawString(cx + 12, cy + 22, f"{score if score is not None else 'NA'} / 5")
 
     # Narrative
-    live = _get_narrative(payload, "page3_liveability", "summary")
+    live = nx.text("page3_liveability", "summary")
     c.setFont(FONT_BOLD, 12)
     c.drawString(M, 360, "Summary")
     if live:
-        _draw_paragraph(c, M, 342, PAGE_W - 2 * M, _strip_html_to_text(live), 10, 14, max_lines=6)
+        _draw_paragraph(c, M, 342, PAGE_W - 2 * M, live, 10, 14, max_lines=6)
     else:
         _draw_paragraph(c, M, 342, PAGE_W - 2 * M, "Liveability summary is not available for this report.", 10, 14)
 
@@ -569,7 +902,7 @@ def _render_page3_liveability(c: canvas.Canvas, payload: Dict[str, Any], p3: Dic
     _draw_footer(c, "Indices are computed from nearby POIs and connectivity signals.")
 
 
-def _render_page4_market(c: canvas.Canvas, payload: Dict[str, Any], p4: Dict[str, Any], page_no: int) -> None:
+def _render_page4_market(c: canvas.Canvas, payload: Dict[str, Any], p4: Dict[str, Any], page_no: int, nx: NarrativeIndex) -> None:
     _draw_header(c, "Market Snapshot (Buy + Rent)", page_no)
     charts = (payload.get("charts", {}) or {})
     hist = charts.get("p4_supply_hist")
@@ -587,22 +920,20 @@ def _render_page4_market(c: canvas.Canvas, payload: Dict[str, Any], p4: Dict[str
     _draw_footer(c, "Market supply reflects marketplace listings; registrations reflect government records for the stated period.")
 
 
-def _render_page5_trend(c: canvas.Canvas, payload: Dict[str, Any], p5: Dict[str, Any], page_no: int) -> None:
+def _render_page5_trend(c: canvas.Canvas, payload: Dict[str, Any], p5: Dict[str, Any], page_no: int, nx: NarrativeIndex) -> None:
     _draw_header(c, "Asking Price Trend (Locality vs Micro-market)", page_no)
     charts = (payload.get("charts", {}) or {})
     trend = charts.get("p5_price_trend")
 
     _draw_image_box(c, M, 300, PAGE_W - 2 * M, 380, trend)
 
-    narrative = _get_narrative(payload, "page5_price_trend", "trend_narrative") or _get_narrative(
-        payload, "page5_price_trend", "narrative"
-    )
-    bullets = _get_narrative_list(payload, "page5_price_trend", "bullets")
+    narrative = nx.text("page5_price_trend", "trend_narrative") or nx.text("page5_price_trend", "narrative")
+    bullets = nx.items("page5_price_trend", "bullets")
     c.setFont(FONT_BOLD, 12)
     c.setFillColor(colors.HexColor("#111827"))
     c.drawString(M, 270, "Trend Narrative")
     if narrative:
-        y = _draw_paragraph(c, M, 250, PAGE_W - 2 * M, _strip_html_to_text(narrative), 10, 14, max_lines=6)
+        y = _draw_paragraph(c, M, 250, PAGE_W - 2 * M, narrative, 10, 14, max_lines=6)
         if bullets:
             _draw_bullets(c, M, y - 4, PAGE_W - 2 * M, bullets, font_size=10, leading=14, max_items=3)
     else:
@@ -614,22 +945,20 @@ def _render_page5_trend(c: canvas.Canvas, payload: Dict[str, Any], p5: Dict[str,
     _draw_footer(c, "Trend series is limited to available quarters in the source feed.")
 
 
-def _render_page6_nearby(c: canvas.Canvas, payload: Dict[str, Any], p6: Dict[str, Any], page_no: int) -> None:
+def _render_page6_nearby(c: canvas.Canvas, payload: Dict[str, Any], p6: Dict[str, Any], page_no: int, nx: NarrativeIndex) -> None:
     _draw_header(c, "Locality vs Nearby Localities", page_no)
     charts = (payload.get("charts", {}) or {})
     nearby = charts.get("p6_nearby_bar")
 
     _draw_image_box(c, M, 300, PAGE_W - 2 * M, 380, nearby)
 
-    narrative = _get_narrative(payload, "page6_nearby_comparison", "nearby_narrative") or _get_narrative(
-        payload, "page6_nearby_comparison", "narrative"
-    )
-    bullets = _get_narrative_list(payload, "page6_nearby_comparison", "bullets")
+    narrative = nx.text("page6_nearby_comparison", "nearby_narrative") or nx.text("page6_nearby_comparison", "narrative")
+    bullets = nx.items("page6_nearby_comparison", "bullets")
     c.setFont(FONT_BOLD, 12)
     c.setFillColor(colors.HexColor("#111827"))
     c.drawString(M, 270, "Interpretation")
     if narrative:
-        y = _draw_paragraph(c, M, 250, PAGE_W - 2 * M, _strip_html_to_text(narrative), 10, 14, max_lines=6)
+        y = _draw_paragraph(c, M, 250, PAGE_W - 2 * M, narrative, 10, 14, max_lines=6)
         if bullets:
             _draw_bullets(c, M, y - 4, PAGE_W - 2 * M, bullets, font_size=10, leading=14, max_items=3)
     else:
@@ -641,19 +970,19 @@ def _render_page6_nearby(c: canvas.Canvas, payload: Dict[str, Any], p6: Dict[str
     _draw_footer(c, "Nearby set is sourced from DI locationRates in JSON-2.")
 
 
-def _render_page7_ds(c: canvas.Canvas, payload: Dict[str, Any], pX: Dict[str, Any], page_no: int, mode: str) -> None:
+def _render_page7_ds(c: canvas.Canvas, payload: Dict[str, Any], pX: Dict[str, Any], page_no: int, nx: NarrativeIndex, mode: str) -> None:
     title = f"Demand vs Supply ({'Buy' if mode == 'sale' else 'Rent'}) Segmentation"
     _draw_header(c, title, page_no)
 
     # Narrative from Step-5
     narrative_key = "page7_demand_supply_sale" if mode == "sale" else "page8_demand_supply_rent"
-    narrative = _get_narrative(payload, narrative_key, "narrative")
+    narrative = nx.text(narrative_key, "narrative")
 
     if narrative:
         c.setFont(FONT_BOLD, 11)
         c.setFillColor(colors.HexColor("#111827"))
         c.drawString(M, PAGE_H - M - 52, "Summary")
-        _draw_paragraph(c, M, PAGE_H - M - 70, PAGE_W - 2 * M, _strip_html_to_text(narrative), 10, 14, max_lines=3)
+        _draw_paragraph(c, M, PAGE_H - M - 70, PAGE_W - 2 * M, narrative, 10, 14, max_lines=3)
         top_y = PAGE_H - M - 120
     else:
         top_y = PAGE_H - M - 80
@@ -679,13 +1008,13 @@ def _render_page7_ds(c: canvas.Canvas, payload: Dict[str, Any], pX: Dict[str, An
     _draw_footer(c, "Gap = demand% - supply%. Demand% is a signal derived from user behavior/enquiries.")
 
 
-def _render_page9_type_status(c: canvas.Canvas, payload: Dict[str, Any], p9: Dict[str, Any], page_no: int) -> None:
+def _render_page9_type_status(c: canvas.Canvas, payload: Dict[str, Any], p9: Dict[str, Any], page_no: int, nx: NarrativeIndex) -> None:
     _draw_header(c, "Rates by Property Type and Project Status", page_no)
     charts = (payload.get("charts", {}) or {})
     pt = charts.get("p9_property_types")
     st = charts.get("p9_property_status")
 
-    narrative = _get_narrative(payload, "page9_propertytype_status", "narrative")
+    narrative = nx.text("page9_propertytype_status", "narrative")
 
     c.setFont(FONT_BOLD, 12)
     c.setFillColor(colors.HexColor("#111827"))
@@ -695,7 +1024,7 @@ def _render_page9_type_status(c: canvas.Canvas, payload: Dict[str, Any], p9: Dic
     c.setFont(FONT_BOLD, 11)
     c.drawString(M, 440, "Summary")
     if narrative:
-        _draw_paragraph(c, M, 422, PAGE_W - 2 * M, _strip_html_to_text(narrative), 10, 14, max_lines=3)
+        _draw_paragraph(c, M, 422, PAGE_W - 2 * M, narrative, 10, 14, max_lines=3)
     else:
         _draw_paragraph(c, M, 422, PAGE_W - 2 * M, "Narrative not available for this section.", 10, 14, max_lines=2)
 
@@ -706,7 +1035,7 @@ def _render_page9_type_status(c: canvas.Canvas, payload: Dict[str, Any], p9: Dic
     _draw_footer(c, "Change% is derived from the source feed and reflects the stated comparison window.")
 
 
-def _render_page10_projects(c: canvas.Canvas, payload: Dict[str, Any], p10: Dict[str, Any], page_no: int) -> None:
+def _render_page10_projects(c: canvas.Canvas, payload: Dict[str, Any], p10: Dict[str, Any], page_no: int, nx: NarrativeIndex) -> None:
     _draw_header(c, "Top Projects (Transactions · Rates · Value)", page_no)
 
     tp = _pick(p10, "data.topProjects", {}) or {}
@@ -715,15 +1044,15 @@ def _render_page10_projects(c: canvas.Canvas, payload: Dict[str, Any], p10: Dict
     by_val = _pick(tp, "byValue.projects", []) or []
 
     # LLM highlights are expected as a list in Step-5 schema.
-    highlights_list = _get_narrative_list(payload, "page10_top_projects", "highlights")
-    highlights_text = _get_narrative(payload, "page10_top_projects", "highlights")
+    highlights_list = nx.items("page10_top_projects", "highlights")
+    highlights_text = nx.text("page10_top_projects", "highlights")
     c.setFont(FONT_BOLD, 11)
     c.setFillColor(colors.HexColor("#111827"))
     c.drawString(M, PAGE_H - M - 45, "Highlights")
     if highlights_list:
         _draw_bullets(c, M, PAGE_H - M - 62, PAGE_W - 2 * M, highlights_list, font_size=9, leading=12, max_items=3)
     elif highlights_text:
-        _draw_paragraph(c, M, PAGE_H - M - 62, PAGE_W - 2 * M, _strip_html_to_text(highlights_text), 9, 12, max_lines=3)
+        _draw_paragraph(c, M, PAGE_H - M - 62, PAGE_W - 2 * M, highlights_text, 9, 12, max_lines=3)
     else:
         _draw_paragraph(c, M, PAGE_H - M - 62, PAGE_W - 2 * M, "Highlights are not available for this report.", 9, 12, max_lines=3)
 
@@ -760,11 +1089,13 @@ def _render_page10_projects(c: canvas.Canvas, payload: Dict[str, Any], p10: Dict
 
     y -= 24
     c.setFont(FONT_BOLD, 11)
+    c.setFillColor(colors.HexColor("#111827"))
     c.drawString(M, y, "Top by Listing Rate")
     y = _draw_table(c, M, y - 8, table_w, rows_for(by_rate, "currentRate"), spec, max_rows=10)
 
     y -= 24
     c.setFont(FONT_BOLD, 11)
+    c.setFillColor(colors.HexColor("#111827"))
     c.drawString(M, y, "Top by Gross Value")
     if by_val:
         y = _draw_table(c, M, y - 8, table_w, rows_for(by_val, "grossValue"), spec, max_rows=10)
@@ -776,7 +1107,7 @@ def _render_page10_projects(c: canvas.Canvas, payload: Dict[str, Any], p10: Dict
     _draw_footer(c, "Leaderboards are computed from available source fields; missing values are shown as —.")
 
 
-def _render_page11_regs_devs(c: canvas.Canvas, payload: Dict[str, Any], p11: Dict[str, Any], page_no: int) -> None:
+def _render_page11_regs_devs(c: canvas.Canvas, payload: Dict[str, Any], p11: Dict[str, Any], page_no: int, nx: NarrativeIndex) -> None:
     _draw_header(c, "Registration Overview + Top Developers", page_no)
     charts = (payload.get("charts", {}) or {})
     dev_txn = charts.get("p11_devs_txn")
@@ -808,13 +1139,13 @@ def _render_page11_regs_devs(c: canvas.Canvas, payload: Dict[str, Any], p11: Dic
     c.drawString(M, PAGE_H - 160, "Top Developers by Transactions")
     _draw_image_box(c, M, 360, PAGE_W - 2 * M, 220, dev_txn)
 
-    narrative = _get_narrative(payload, "page11_registrations_developers", "narrative")
-    recent_summary = _get_narrative(payload, "page11_registrations_developers", "recent_transactions_summary")
+    narrative = nx.text("page11_registrations_developers", "narrative")
+    recent_summary = nx.text("page11_registrations_developers", "recent_transactions_summary")
 
     c.setFont(FONT_BOLD, 12)
     c.drawString(M, 335, "Interpretation")
     if narrative:
-        _draw_paragraph(c, M, 317, PAGE_W - 2 * M, _strip_html_to_text(narrative), 10, 14, max_lines=3)
+        _draw_paragraph(c, M, 317, PAGE_W - 2 * M, narrative, 10, 14, max_lines=3)
         y_cursor = 270
     else:
         _draw_paragraph(c, M, 317, PAGE_W - 2 * M, "Interpretation narrative is not available for this report.", 10, 14, max_lines=2)
@@ -827,7 +1158,7 @@ def _render_page11_regs_devs(c: canvas.Canvas, payload: Dict[str, Any], p11: Dic
     y_cursor -= 14
 
     if recent_summary:
-        y_cursor = _draw_paragraph(c, M, y_cursor, PAGE_W - 2 * M, _strip_html_to_text(recent_summary), 9, 12, max_lines=2) - 4
+        y_cursor = _draw_paragraph(c, M, y_cursor, PAGE_W - 2 * M, recent_summary, 9, 12, max_lines=2) - 4
 
     # Render a table (top N rows)
     if isinstance(recent_txns, list) and recent_txns:
@@ -859,7 +1190,7 @@ def _render_page11_regs_devs(c: canvas.Canvas, payload: Dict[str, Any], p11: Dic
     _draw_footer(c, "Registrations are government-recorded; marketplace listings are separate supply signals.")
 
 
-def _render_page12_reviews(c: canvas.Canvas, payload: Dict[str, Any], p12: Dict[str, Any], page_no: int) -> None:
+def _render_page12_reviews(c: canvas.Canvas, payload: Dict[str, Any], p12: Dict[str, Any], page_no: int, nx: NarrativeIndex) -> None:
     _draw_header(c, "Ratings & Reviews + Conclusion", page_no)
 
     d = p12.get("data", {}) or {}
@@ -953,10 +1284,10 @@ def _render_page12_reviews(c: canvas.Canvas, payload: Dict[str, Any], p12: Dict[
             break
 
     # LLM summary/conclusion (Step-5 schema)
-    strengths = _get_narrative_list(payload, "page12_reviews_conclusion", "strengths")
-    challenges = _get_narrative_list(payload, "page12_reviews_conclusion", "challenges")
-    opportunities = _get_narrative_list(payload, "page12_reviews_conclusion", "opportunities")
-    closing_note = _get_narrative(payload, "page12_reviews_conclusion", "closing_note")
+    strengths = nx.items("page12_reviews_conclusion", "strengths")
+    challenges = nx.items("page12_reviews_conclusion", "challenges")
+    opportunities = nx.items("page12_reviews_conclusion", "opportunities")
+    closing_note = nx.text("page12_reviews_conclusion", "closing_note")
 
     # Conclusion narrative
     c.setFont(FONT_BOLD, 11)
@@ -980,7 +1311,7 @@ def _render_page12_reviews(c: canvas.Canvas, payload: Dict[str, Any], p12: Dict[
 
     if closing_note:
         c.setFont(FONT_BODY, 10)
-        _draw_paragraph(c, M, max(y0, 70), PAGE_W - 2 * M, _strip_html_to_text(closing_note), 10, 14, max_lines=4)
+        _draw_paragraph(c, M, max(y0, 70), PAGE_W - 2 * M, closing_note, 10, 14, max_lines=4)
     else:
         c.setFont(FONT_BODY, 10)
         _draw_paragraph(c, M, max(y0, 70), PAGE_W - 2 * M, "Closing note is not available for this report.", 10, 14, max_lines=4)
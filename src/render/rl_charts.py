@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from reportlab.graphics import renderPDF
+from reportlab.graphics.charts.barcharts import HorizontalBarChart, VerticalBarChart
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.charts.linecharts import HorizontalLineChart
+from reportlab.graphics.shapes import Drawing, Group, String
+from reportlab.graphics.widgets.markers import makeMarker
+from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from src.utils.money import parse_inr_compact
+
+# Native ReportLab chart backend. Step 3 turns each chart job into a small
+# JSON spec (bar / grouped_bar / line / hbar + prepared series); render_pdf
+# draws the spec with reportlab.graphics straight into the page. Neither side
+# imports matplotlib.
+#
+#   {"chart": "grouped_bar", "title": ..., "xlabel": ..., "ylabel": ...,
+#    "labels": [...], "series": [[...], ...], "legend": [...] | null, "rotate": bool}
+
+FONT = "Helvetica"
+FONT_BOLD = "Helvetica-Bold"
+SERIES_COLORS = [colors.HexColor("#1F77B4"), colors.HexColor("#FF7F0E")]
+GRID = colors.HexColor("#E5E7EB")
+TEXT = colors.HexColor("#111827")
+
+
+# -----------------------
+# Specs (mirror the data prep in src/render/charts.py)
+# -----------------------
+def _price_trend(points: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # Expect points in newest->oldest; plot oldest->newest for natural trend.
+    pts = list(reversed(points))
+    return {
+        "chart": "line",
+        "title": "Asking Price Trend (Locality vs Micro-market)",
+        "xlabel": "Quarter",
+        "ylabel": "Rate (₹/sq ft)",
+        "labels": [p.get("quarterName", "") for p in pts],
+        "series": [
+            [float(p.get("locationRate") or 0.0) for p in pts],
+            [float(p.get("micromarketRate") or 0.0) for p in pts],
+        ],
+        "legend": ["Locality", "Micro-market"],
+    }
+
+
+def _histogram_buckets(graph_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "chart": "bar",
+        "title": "Market Supply Distribution (Listing Rate Buckets)",
+        "xlabel": "₹/sq ft bucket",
+        "ylabel": "Listings",
+        "labels": [d.get("bucketRange", "") for d in graph_data],
+        "series": [[int(d.get("saleCount") or 0) for d in graph_data]],
+        "rotate": True,
+    }
+
+
+def _rent_by_bhk(rental_bhk_stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "chart": "bar",
+        "title": "Average Monthly Rent by Unit Type",
+        "xlabel": "Unit Type",
+        "ylabel": "Monthly rent (₹)",
+        "labels": [d.get("unitType", "") for d in rental_bhk_stats],
+        "series": [[parse_inr_compact(d.get("avgRate")) or 0.0 for d in rental_bhk_stats]],
+    }
+
+
+def _nearby_rates(location_rates: List[Dict[str, Any]], max_n: int = 10) -> Dict[str, Any]:
+    rows = [(r.get("name") or "", float(r["avgRate"])) for r in location_rates if r.get("avgRate") is not None]
+    rows.sort(key=lambda x: x[1], reverse=True)
+    rows = rows[:max_n]
+    return {
+        "chart": "hbar",
+        "title": "Locality vs Nearby Localities (Avg Rate)",
+        "xlabel": "Rate (₹/sq ft)",
+        "ylabel": "",
+        "labels": [x[0] for x in rows],  # top to bottom
+        "series": [[x[1] for x in rows]],
+    }
+
+
+def _dual_gap_bars(items: List[Dict[str, Any]], title: str, max_n: int = 12) -> Dict[str, Any]:
+    trimmed = items[:max_n]
+    return {
+        "chart": "grouped_bar",
+        "title": title,
+        "xlabel": "Segment",
+        "ylabel": "Share (%)",
+        "labels": [i.get("name", "") for i in trimmed],
+        "series": [
+            [float(i.get("demandPercent") or 0.0) for i in trimmed],
+            [float(i.get("supplyPercent") or 0.0) for i in trimmed],
+        ],
+        "legend": ["Demand %", "Supply %"],
+        "rotate": True,
+    }
+
+
+def _simple_bar(
+    labels: List[str], values: List[float], title: str, xlabel: str, ylabel: str, rotate: bool = True
+) -> Dict[str, Any]:
+    return {
+        "chart": "bar",
+        "title": title,
+        "xlabel": xlabel,
+        "ylabel": ylabel,
+        "labels": list(labels),
+        "series": [[float(v) for v in values]],
+        "rotate": rotate,
+    }
+
+
+SPEC_BUILDERS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "price_trend": _price_trend,
+    "histogram_buckets": _histogram_buckets,
+    "rent_by_bhk": _rent_by_bhk,
+    "nearby_rates": _nearby_rates,
+    "dual_gap_bars": _dual_gap_bars,
+    "simple_bar": _simple_bar,
+}
+
+
+def chart_spec(kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    spec = SPEC_BUILDERS[kind](**params)
+    if not spec["labels"]:
+        raise ValueError(f"{kind}: nothing to plot")
+    return spec
+
+
+def write_chart_spec(kind: str, params: Dict[str, Any], out_path: Path) -> None:
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(chart_spec(kind, params), ensure_ascii=False), encoding="utf-8")
+
+
+# -----------------------
+# Drawing
+# -----------------------
+def _value_max(series: List[List[float]]) -> float:
+    top = max((v for s in series for v in s), default=0.0)
+    return top * 1.05 if top > 0 else 1.0
+
+
+def _style_value_axis(axis: Any, series: List[List[float]]) -> None:
+    axis.valueMin = 0
+    axis.valueMax = _value_max(series)
+    axis.labels.fontName = FONT
+    axis.labels.fontSize = 7
+    axis.visibleGrid = 1
+    axis.gridStrokeColor = GRID
+    axis.gridStrokeWidth = 0.5
+    axis.strokeColor = TEXT
+    axis.strokeWidth = 0.5
+
+
+def _style_category_axis(axis: Any, labels: List[str], rotate: bool) -> None:
+    axis.categoryNames = labels
+    axis.labels.fontName = FONT
+    axis.labels.fontSize = 7
+    axis.strokeColor = TEXT
+    axis.strokeWidth = 0.5
+    if rotate:
+        axis.labels.angle = 20
+        axis.labels.boxAnchor = "ne"
+        axis.labels.dx = 2
+        axis.labels.dy = -2
+
+
+def build_drawing(spec: Dict[str, Any], w: float, h: float) -> Drawing:
+    """Chart spec -> Drawing of exactly w x h points."""
+    d = Drawing(w, h)
+    labels = spec.get("labels") or []
+    series = spec.get("series") or []
+    kind = spec.get("chart")
+    rotate = bool(spec.get("rotate"))
+
+    # margins sized to the actual tick labels
+    label_w = max((stringWidth(str(s), FONT, 7) for s in labels), default=0.0)
+    top = 22
+    bottom = 30 + (label_w * math.sin(math.radians(20)) if rotate and kind != "hbar" else 0)
+    left = 44 + (label_w if kind == "hbar" else 0)
+    bottom = min(bottom, h * 0.4)
+    left = min(left, w * 0.45)
+    pw, ph = max(w - left - 10, 10), max(h - top - bottom, 10)
+
+    if kind == "line":
+        chart = HorizontalLineChart()
+        chart.data = [tuple(s) for s in series]
+        chart.joinedLines = 1
+        for i in range(len(series)):
+            chart.lines[i].strokeColor = SERIES_COLORS[i % len(SERIES_COLORS)]
+            chart.lines[i].strokeWidth = 1.5
+            chart.lines[i].symbol = makeMarker("FilledCircle", size=3)
+            chart.lines[i].symbol.fillColor = SERIES_COLORS[i % len(SERIES_COLORS)]
+            chart.lines[i].symbol.strokeColor = None
+        lo = min((v for s in series for v in s), default=0.0)
+        _style_value_axis(chart.valueAxis, series)
+        chart.valueAxis.valueMin = lo * 0.95 if lo > 0 else 0
+    elif kind == "hbar":
+        chart = HorizontalBarChart()
+        # category axis runs bottom -> top; labels are top -> bottom
+        labels = list(reversed(labels))
+        series = [list(reversed(s)) for s in series]
+        chart.data = [tuple(s) for s in series]
+        _style_value_axis(chart.valueAxis, series)
+    else:  # bar / grouped_bar
+        chart = VerticalBarChart()
+        chart.data = [tuple(s) for s in series]
+        chart.groupSpacing = 6
+        chart.barSpacing = 0
+        _style_value_axis(chart.valueAxis, series)
+
+    chart.x, chart.y, chart.width, chart.height = left, bottom, pw, ph
+    _style_category_axis(chart.categoryAxis, labels, rotate and kind != "hbar")
+    if kind != "line":
+        for i in range(len(series)):
+            chart.bars[i].fillColor = SERIES_COLORS[i % len(SERIES_COLORS)]
+            chart.bars[i].strokeColor = None
+    d.add(chart)
+
+    d.add(String(w / 2, h - 14, spec.get("title") or "", fontName=FONT_BOLD, fontSize=10, fillColor=TEXT, textAnchor="middle"))
+    if spec.get("xlabel"):
+        d.add(String(left + pw / 2, 4, spec["xlabel"], fontName=FONT, fontSize=8, fillColor=TEXT, textAnchor="middle"))
+    if spec.get("ylabel"):
+        g = Group(String(0, 0, spec["ylabel"], fontName=FONT, fontSize=8, fillColor=TEXT, textAnchor="middle"))
+        g.translate(10, bottom + ph / 2)
+        g.rotate(90)
+        d.add(g)
+
+    legend: Optional[List[str]] = spec.get("legend")
+    if legend:
+        lg = Legend()
+        lg.alignment = "right"
+        lg.fontName = FONT
+        lg.fontSize = 7
+        lg.boxAnchor = "ne"
+        lg.x, lg.y = left + pw - 4, bottom + ph - 4
+        lg.columnMaximum = len(legend)
+        lg.dx = lg.dy = 6
+        lg.strokeColor = None
+        lg.colorNamePairs = [(SERIES_COLORS[i % len(SERIES_COLORS)], name) for i, name in enumerate(legend)]
+        d.add(lg)
+    return d
+
+
+def draw_chart_spec(c: canvas.Canvas, spec: Dict[str, Any], x: float, y: float, w: float, h: float) -> None:
+    renderPDF.draw(build_drawing(spec, w, h), c, x, y)
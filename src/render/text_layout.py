@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Tuple
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+# Text layout for the PDF renderer. Words are measured once per font (in font
+# units, 1/1000 em, so one measurement serves every size; the cache is LRU
+# bounded so long-lived batch workers do not grow) and lines are broken
+# greedily from running sums of those widths: linear in the number of words
+# instead of re-measuring the growing line for every word. Whole layouts are
+# memoised per (text, width, font, size), so narratives laid out for the draft
+# PDF are free when the final PDF is rendered in the same process.
+
+WORD_CACHE_SIZE = 65536  # a report uses a few thousand distinct words; bounds long batch workers
+
+
+@lru_cache(maxsize=WORD_CACHE_SIZE)
+def word_units(word: str, font: str) -> float:
+    """Width of word at 1000 pt, i.e. in font units; memoised per (word, font)."""
+    # standard fonts sum integer glyph widths; round off the 0.001 * 1000 noise
+    return round(stringWidth(word, font, 1000), 6)
+
+
+@lru_cache(maxsize=4096)
+def wrap_text(text: str, max_w: float, font: str, size: float) -> Tuple[str, ...]:
+    """
+    Greedy line breaking on whitespace (words joined by single spaces), same
+    result as re-measuring every candidate line with stringWidth.
+    """
+    words = (text or "").split()
+    if not words:
+        return ()
+    # compare in font units, scaled the way stringWidth scales (sum * 0.001 * size)
+    space = word_units(" ", font)
+    lines = []
+    start = 0
+    cur = word_units(words[0], font)
+    for i in range(1, len(words)):
+        u = word_units(words[i], font)
+        if (cur + space + u) * 0.001 * size <= max_w:
+            cur += space + u
+        else:
+            lines.append(" ".join(words[start:i]))
+            start, cur = i, u
+    lines.append(" ".join(words[start:]))
+    return tuple(lines)
@@ -26,13 +26,19 @@ def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--in", dest="inp", default="out/report_payload.json", help="Step1 payload path")
     ap.add_argument("--outdir", default="out", help="Output directory")
+    ap.add_argument(
+        "--previous",
+        default=None,
+        help="Earlier report_payload_step2/3/5.json: only pages whose source blocks changed are recomputed",
+    )
     args = ap.parse_args()
 
     inp_path = Path(args.inp)
     outdir = Path(args.outdir)
 
     payload = _read_json(inp_path)
-    step2_payload, step2_quality = compute_step2(payload)
+    previous = _read_json(Path(args.previous)) if args.previous else None
+    step2_payload, step2_quality = compute_step2(payload, previous=previous)
 
     _write_json(outdir / "report_payload_step2.json", step2_payload)
     _write_json(outdir / "quality_report_step2.json", step2_quality)
@@ -40,6 +46,14 @@ def main() -> None:
     print("Done.")
     print(f"Step2 payload: {outdir / 'report_payload_step2.json'}")
     print(f"Step2 quality report: {outdir / 'quality_report_step2.json'}")
+    ctx_hits = sum(v["hits"] for v in step2_quality["context_cache"].values())
+    print(f"Shared artifacts: {len(step2_quality['context_cache'])} kind(s), {ctx_hits} cache hit(s)")
+
+    if "incremental" in step2_quality:
+        inc = step2_quality["incremental"]
+        print(f"Recomputed {len(inc['recomputed_pages'])} page(s), reused {len(inc['reused_pages'])}")
+        if not inc["previous_code_matches"]:
+            print("Previous payload came from other step-2 code: nothing reused")
 
     if step2_quality.get("warnings"):
         print(f"Warnings: {len(step2_quality['warnings'])} (see quality_report_step2.json)")
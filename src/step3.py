@@ -2,18 +2,35 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict
-
-from src.render.charts import (
-    chart_dual_gap_bars,
-    chart_histogram_buckets,
-    chart_nearby_rates,
-    chart_price_trend,
-    chart_rent_by_bhk,
-    chart_simple_bar,
+from typing import Any, Dict, List, Optional
+
+from src.render.chart_cache import DEFAULT_MAX_MB, ChartCache, chart_job_key
+from src.render.chart_jobs import (
+    CHART_BACKENDS,
+    CHART_DOC_SUFFIX,
+    CHART_FORMATS,
+    ChartJob,
+    backend_modules,
+    backend_version,
+    render_chart_job,
+    warm_chart_worker,
 )
 from src.render.pdf import render_pdf
+from src.utils.build_cache import BuildCache, code_version, fingerprint
+
+# Pages whose data/computed blocks feed generate_charts (cache key scope).
+CHART_SOURCE_PAGES = [
+    "page4_market_snapshot",
+    "page5_price_trend",
+    "page6_nearby_comparison",
+    "page7_demand_supply_sale",
+    "page8_demand_supply_rent",
+    "page9_propertytype_status",
+    "page11_registrations_developers",
+]
 
 
 def _read_json(path: Path) -> Dict[str, Any]:
@@ -27,22 +44,31 @@ def _write_json(path: Path, obj: Dict[str, Any]) -> None:
         json.dump(obj, f, ensure_ascii=False, indent=2)
 
 
-def main() -> None:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--in", dest="inp", required=True, help="Path to report_payload_step2.json")
-    ap.add_argument("--outdir", required=True, help="Output directory")
-    args = ap.parse_args()
-
-    inp_path = Path(args.inp).expanduser()
-    outdir = Path(args.outdir).expanduser()
-    outdir.mkdir(parents=True, exist_ok=True)
-
-    payload = _read_json(inp_path)
-
-    charts_dir = outdir / "charts"
-    charts_dir.mkdir(parents=True, exist_ok=True)
-
-    charts: Dict[str, str] = {}
+def charts_cache_key(payload: Dict[str, Any], fmt: str = "png", backend: str = "matplotlib") -> str:
+    return fingerprint(
+        backend,
+        fmt,
+        {k: payload.get(k) for k in CHART_SOURCE_PAGES},
+        code_version("src.step3", "src.render.chart_jobs", *backend_modules(backend)),
+        backend_version(backend),
+    )
+
+
+def plan_chart_jobs(
+    payload: Dict[str, Any], charts_dir: Path, fmt: str = "png", backend: str = "matplotlib"
+) -> List[ChartJob]:
+    """
+    Turns the payload into one ChartJob per chart it has data for (in render order).
+    A page whose data cannot be read contributes no jobs (page renders a placeholder).
+    fmt: matplotlib output, "png" or "vector" (see CHART_FORMATS).
+    backend="reportlab" writes chart specs that render_pdf draws natively (fmt is ignored).
+    """
+    jobs: List[ChartJob] = []
+    suffix = CHART_DOC_SUFFIX if backend == "reportlab" else CHART_FORMATS[fmt]
+
+    def add(key: str, kind: str, **params: Any) -> None:
+        out_path = str(charts_dir / f"{key}{suffix}")
+        jobs.append(ChartJob(key=key, kind=kind, out_path=out_path, params=params, backend=backend))
 
     # Page 4 charts
     try:
@@ -50,16 +76,12 @@ def main() -> None:
         ms = (p4.get("data", {}) or {}).get("marketSupply", {}) or {}
         gd = ms.get("graphData") or []
         if gd:
-            out = charts_dir / "p4_supply_hist.png"
-            chart_histogram_buckets(gd, out)
-            charts["p4_supply_hist"] = str(out)
+            add("p4_supply_hist", "histogram_buckets", graph_data=gd)
 
         rental = (p4.get("data", {}) or {}).get("rentalStats", {}) or {}
         rb = rental.get("rentalBHKStats") or []
         if rb:
-            out = charts_dir / "p4_rent_bhk.png"
-            chart_rent_by_bhk(rb, out)
-            charts["p4_rent_bhk"] = str(out)
+            add("p4_rent_bhk", "rent_by_bhk", rental_bhk_stats=rb)
     except Exception:
         # Keep deterministic behavior: missing chart => no path, page still renders placeholders.
         pass
@@ -69,9 +91,7 @@ def main() -> None:
         p5 = payload.get("page5_price_trend", {})
         pts = (p5.get("computed", {}) or {}).get("points") or (p5.get("data", {}) or {}).get("priceTrend") or []
         if pts:
-            out = charts_dir / "p5_price_trend.png"
-            chart_price_trend(pts, out)
-            charts["p5_price_trend"] = str(out)
+            add("p5_price_trend", "price_trend", points=pts)
     except Exception:
         pass
 
@@ -80,14 +100,12 @@ def main() -> None:
         p6 = payload.get("page6_nearby_comparison", {})
         loc_rates = (p6.get("data", {}) or {}).get("locationRates") or []
         if loc_rates:
-            out = charts_dir / "p6_nearby_bar.png"
-            chart_nearby_rates(loc_rates, out, max_n=10)
-            charts["p6_nearby_bar"] = str(out)
+            add("p6_nearby_bar", "nearby_rates", location_rates=loc_rates, max_n=10)
     except Exception:
         pass
 
     # Page 7/8 demand-supply charts
-    def build_ds_arrays(d: Dict[str, Any], page_no: int) -> None:
+    def build_ds_jobs(d: Dict[str, Any], page_no: int) -> None:
         """
         d must be a dict containing:
           unitType[], propertyType[], totalPrice_range[]
@@ -97,24 +115,18 @@ def main() -> None:
         band = d.get("totalPrice_range") or []
 
         if unit:
-            out = charts_dir / f"p{page_no}_ds_unit.png"
-            chart_dual_gap_bars(unit, out, title="Demand vs Supply - Unit Type")
-            charts[f"p{page_no}_ds_unit"] = str(out)
+            add(f"p{page_no}_ds_unit", "dual_gap_bars", items=unit, title="Demand vs Supply - Unit Type")
         if ptype:
-            out = charts_dir / f"p{page_no}_ds_ptype.png"
-            chart_dual_gap_bars(ptype, out, title="Demand vs Supply - Property Type")
-            charts[f"p{page_no}_ds_ptype"] = str(out)
+            add(f"p{page_no}_ds_ptype", "dual_gap_bars", items=ptype, title="Demand vs Supply - Property Type")
         if band:
-            out = charts_dir / f"p{page_no}_ds_band.png"
-            chart_dual_gap_bars(band, out, title="Demand vs Supply - Price Band")
-            charts[f"p{page_no}_ds_band"] = str(out)
+            add(f"p{page_no}_ds_band", "dual_gap_bars", items=band, title="Demand vs Supply - Price Band")
 
     # FIX: Page 7 uses data.sale (not data.demandSupply)
     try:
         p7 = payload.get("page7_demand_supply_sale", {})
         d7 = (p7.get("data", {}) or {}).get("sale") or {}
         if d7:
-            build_ds_arrays(d7, 7)
+            build_ds_jobs(d7, 7)
     except Exception:
         pass
 
@@ -123,7 +135,7 @@ def main() -> None:
         p8 = payload.get("page8_demand_supply_rent", {})
         d8 = (p8.get("data", {}) or {}).get("rent") or {}
         if d8:
-            build_ds_arrays(d8, 8)
+            build_ds_jobs(d8, 8)
     except Exception:
         pass
 
@@ -137,16 +149,14 @@ def main() -> None:
         if ptypes:
             labels = [x.get("propertyType", "") for x in ptypes]
             values = [float(x.get("avgPrice") or 0.0) for x in ptypes]
-            out = charts_dir / "p9_property_types.png"
-            chart_simple_bar(labels, values, out, "Rates by Property Type", "Property Type", "Rate (₹/sq ft)", rotate=True)
-            charts["p9_property_types"] = str(out)
+            add("p9_property_types", "simple_bar", labels=labels, values=values, title="Rates by Property Type",
+                xlabel="Property Type", ylabel="Rate (₹/sq ft)", rotate=True)
 
         if status:
             labels = [x.get("status", "") for x in status]
             values = [float(x.get("avgPrice") or 0.0) for x in status]
-            out = charts_dir / "p9_property_status.png"
-            chart_simple_bar(labels, values, out, "Rates by Project Status", "Status", "Rate (₹/sq ft)", rotate=True)
-            charts["p9_property_status"] = str(out)
+            add("p9_property_status", "simple_bar", labels=labels, values=values, title="Rates by Project Status",
+                xlabel="Status", ylabel="Rate (₹/sq ft)", rotate=True)
     except Exception:
         pass
 
@@ -158,48 +168,132 @@ def main() -> None:
         if devs:
             labels = [x.get("developerName", "") for x in devs]
             values = [float(x.get("noOfTransactions") or 0.0) for x in devs]
-            out = charts_dir / "p11_devs_txn.png"
-            chart_simple_bar(labels, values, out, "Top Developers by Transactions", "Developer", "Transactions", rotate=True)
-            charts["p11_devs_txn"] = str(out)
+            add("p11_devs_txn", "simple_bar", labels=labels, values=values, title="Top Developers by Transactions",
+                xlabel="Developer", ylabel="Transactions", rotate=True)
     except Exception:
         pass
 
-    # Attach charts into payload
-    payload["charts"] = charts
-
-    # Write step3 payload
-    step3_payload_path = outdir / "report_payload_step3.json"
-    _write_json(step3_payload_path, payload)
-
-    # Render PDF
-    locality = (payload.get("meta", {}) or {}).get("locality", "Locality")
-    out_pdf = outdir / f"{locality} Locality Report.pdf"
-    render_pdf(payload, out_pdf)
+    return jobs
+
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_SIZE = 0
+
+
+def _chart_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Process-wide pool of warm matplotlib workers, reused across generate_charts
+    calls. Keyed on the configured size only: a call with fewer jobs just
+    submits fewer (workers are started on demand), so the pool survives
+    localities whose chart-cache miss counts differ.
+    """
+    global _POOL, _POOL_SIZE
+    if _POOL is None or _POOL_SIZE != workers:
+        if _POOL is not None:
+            _POOL.shutdown()
+        _POOL = ProcessPoolExecutor(max_workers=workers, initializer=warm_chart_worker, initargs=("matplotlib",))
+        _POOL_SIZE = workers
+    return _POOL
+
+
+def render_chart_jobs(
+    jobs: List[ChartJob], workers: Optional[int] = None, chart_cache: Optional[ChartCache] = None
+) -> Dict[str, str]:
+    """
+    Renders jobs and returns {chart_key: png_path} in job order; failed charts are left out.
+    workers: pool size (None = CPU count); 1, or a single chart to render, runs in-process.
+    chart_cache: charts whose content key is cached are linked from it instead of rendered.
+    """
+    done: Dict[str, str] = {}
+    todo: List[ChartJob] = []
+    keys: Dict[str, str] = {}
+    for job in jobs:
+        if chart_cache is not None:
+            keys[job.key] = chart_job_key(job)
+            if chart_cache.get(keys[job.key], Path(job.out_path)):
+                done[job.key] = job.out_path
+                continue
+        todo.append(job)
+
+    n = workers or os.cpu_count() or 1
+    # reportlab specs are plain JSON writes; a pool would only add overhead
+    if n <= 1 or len(todo) <= 1 or all(job.backend == "reportlab" for job in todo):
+        results = [render_chart_job(job) for job in todo]
+    else:
+        results = list(_chart_pool(n).map(render_chart_job, todo))
+    for key, path, _ in results:
+        if path is None:
+            continue
+        done[key] = path
+        if chart_cache is not None:
+            chart_cache.put(keys[key], Path(path))
+    if chart_cache is not None and results:
+        chart_cache.evict()
+    return {job.key: done[job.key] for job in jobs if job.key in done}
+
+
+def generate_charts(
+    payload: Dict[str, Any],
+    charts_dir: Path,
+    cache: Optional[BuildCache] = None,
+    workers: Optional[int] = None,
+    chart_cache: Optional[ChartCache] = None,
+    fmt: str = "png",
+    backend: str = "matplotlib",
+) -> Dict[str, str]:
+    """
+    Renders every chart the payload has data for into charts_dir.
+    Returns {chart_key: file_path}. A failing chart is skipped (page renders a placeholder).
+    fmt="vector" writes display lists that render_pdf draws as vector graphics;
+    backend="reportlab" writes chart specs render_pdf draws natively (no matplotlib import).
+    With a cache, identical chart inputs restore the previous PNGs instead.
+    workers / chart_cache: see render_chart_jobs.
+    """
+    charts_dir.mkdir(parents=True, exist_ok=True)
 
-    # Quality report (keep your existing policy; optional improvement later)
-    q = {
-        "input": str(inp_path),
-        "output_payload": str(step3_payload_path),
-        "output_pdf": str(out_pdf),
+    key = charts_cache_key(payload, fmt, backend) if cache is not None else ""
+    if cache is not None:
+        restored = cache.get_files("charts", key, charts_dir)
+        if restored is not None:
+            return restored
+
+    charts = render_chart_jobs(
+        plan_chart_jobs(payload, charts_dir, fmt, backend), workers=workers, chart_cache=chart_cache
+    )
+
+    if cache is not None:
+        cache.put_files("charts", key, charts)
+    return charts
+
+
+EXPECTED_PAGES = [
+    "page1_cover",
+    "page2_exec_snapshot",
+    "page3_liveability",
+    "page4_market_snapshot",
+    "page5_price_trend",
+    "page6_nearby_comparison",
+    "page7_demand_supply_sale",
+    "page8_demand_supply_rent",
+    "page9_propertytype_status",
+    "page10_top_projects",
+    "page11_registrations_developers",
+    "page12_reviews_conclusion",
+]
+
+
+def build_step3_quality(
+    payload: Dict[str, Any], charts: Dict[str, str], chart_cache: Optional[ChartCache] = None
+) -> Dict[str, Any]:
+    """Charts generated + missing-page / missing-chart-file warnings (+ chart cache stats)."""
+    q: Dict[str, Any] = {
         "charts_generated": list(charts.keys()),
         "warnings": [],
     }
+    if chart_cache is not None:
+        q["chart_cache"] = chart_cache.stats()
 
-    expected_pages = [
-        "page1_cover",
-        "page2_exec_snapshot",
-        "page3_liveability",
-        "page4_market_snapshot",
-        "page5_price_trend",
-        "page6_nearby_comparison",
-        "page7_demand_supply_sale",
-        "page8_demand_supply_rent",
-        "page9_propertytype_status",
-        "page10_top_projects",
-        "page11_registrations_developers",
-        "page12_reviews_conclusion",
-    ]
-    missing_pages = [p for p in expected_pages if p not in payload]
+    missing_pages = [p for p in EXPECTED_PAGES if p not in payload]
     if missing_pages:
         q["warnings"].append({"type": "missing_pages", "pages": missing_pages})
 
@@ -212,6 +306,66 @@ def main() -> None:
             missing_charts.append({"chart": k, "path": pth})
     if missing_charts:
         q["warnings"].append({"type": "chart_files_missing", "items": missing_charts})
+    return q
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in", dest="inp", required=True, help="Path to report_payload_step2.json")
+    ap.add_argument("--outdir", required=True, help="Output directory")
+    ap.add_argument("--chart-workers", type=int, default=None, help="Chart process pool size (default: CPU count; 1 = in-process)")
+    ap.add_argument(
+        "--chart-format",
+        choices=sorted(CHART_FORMATS),
+        default="png",
+        help="png (also usable by the UI) or vector (drawn into the PDF as vector graphics)",
+    )
+    ap.add_argument(
+        "--chart-backend",
+        choices=CHART_BACKENDS,
+        default="matplotlib",
+        help="reportlab draws charts natively in the PDF and never imports matplotlib",
+    )
+    ap.add_argument("--pdf-workers", type=int, default=1, help="Render page groups in N processes and merge (needs pypdf)")
+    ap.add_argument("--chart-cache", default=None, help="Reuse identical chart PNGs from this cache folder")
+    ap.add_argument("--chart-cache-mb", type=int, default=DEFAULT_MAX_MB, help="Chart cache size bound (LRU eviction)")
+    args = ap.parse_args()
+
+    inp_path = Path(args.inp).expanduser()
+    outdir = Path(args.outdir).expanduser()
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    payload = _read_json(inp_path)
+
+    chart_cache = None
+    if args.chart_cache:
+        chart_cache = ChartCache(Path(args.chart_cache).expanduser(), max_bytes=args.chart_cache_mb * 1024 * 1024)
+    charts = generate_charts(
+        payload, outdir / "charts", workers=args.chart_workers,
+        chart_cache=chart_cache,
+        fmt=args.chart_format,
+        backend=args.chart_backend,
+    )
+
+    # Attach charts into payload
+    payload["charts"] = charts
+
+    # Write step3 payload
+    step3_payload_path = outdir / "report_payload_step3.json"
+    _write_json(step3_payload_path, payload)
+
+    # Render PDF
+    locality = (payload.get("meta", {}) or {}).get("locality", "Locality")
+    out_pdf = outdir / f"{locality} Locality Report.pdf"
+    render_pdf(payload, out_pdf, page_workers=args.pdf_workers)
+
+    # Quality report (keep your existing policy; optional improvement later)
+    q = {
+        "input": str(inp_path),
+        "output_payload": str(step3_payload_path),
+        "output_pdf": str(out_pdf),
+        **build_step3_quality(payload, charts, chart_cache),
+    }
 
     q_path = outdir / "quality_report_step3.json"
     _write_json(q_path, q)
@@ -227,4 +381,4 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
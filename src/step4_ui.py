@@ -6,6 +6,8 @@ import shutil
 from pathlib import Path
 from typing import Any, Dict
 
+from src.render.narratives import build_narrative_index
+
 
 def _read_json(path: Path) -> Dict[str, Any]:
     return json.loads(path.read_text(encoding="utf-8"))
@@ -46,7 +48,12 @@ def main() -> None:
     public_payload_path = ui / "public" / "report_payload.json"
     _write_json(public_payload_path, payload)
 
-    # 3) Optionally copy PNG charts for future use
+    # 3) Narratives resolved to {page: {field: text | [items]}}, HTML stripped
+    #    (same index the PDF renderer reads, so UI and PDF never disagree)
+    ui_narratives_path = ui / "src" / "data" / "narrative_index.json"
+    _write_json(ui_narratives_path, build_narrative_index(payload).to_json())
+
+    # 4) Optionally copy PNG charts for future use
     copied = []
     if args.copy_charts:
         charts = payload.get("charts") or {}
@@ -64,6 +71,7 @@ def main() -> None:
     print("Done.")
     print(f"Wrote UI data JSON: {ui_data_path}")
     print(f"Wrote UI public JSON: {public_payload_path}")
+    print(f"Wrote UI narrative index: {ui_narratives_path}")
     if args.copy_charts:
         print(f"Copied charts: {len(copied)} file(s)")
 
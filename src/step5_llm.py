@@ -1,13 +1,24 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
+import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
-from src.llm.openai_client import call_structured
-from src.llm.schema import NARRATIVE_SCHEMA
+from src.llm.cache import DEFAULT_LLM_CACHE_DIR, LLMCache
+from src.llm.facts import DEFAULT_PAGE_TOKEN_BUDGET, FactBundle, build_fact_bundle
+from src.llm.openai_client import (
+    batch_request,
+    call_structured_async,
+    get_async_client,
+    get_model,
+    read_batch_results,
+)
+from src.llm.schema import NARRATIVE_PAGES, page_schema
 from src.render.pdf import render_pdf
+from src.utils.build_cache import fingerprint
 
 
 def _read_json(path: Path) -> Dict[str, Any]:
@@ -19,36 +30,23 @@ def _write_json(path: Path, obj: Dict[str, Any]) -> None:
     path.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
 
 
-def build_llm_input(payload: Dict[str, Any]) -> str:
+# Pages whose copy summarises the whole report: their request sees every page's facts.
+SUMMARY_PAGES = ("page2_exec_snapshot", "page12_reviews_conclusion")
+
+# Per-page requests in flight at once (per report).
+DEFAULT_LLM_CONCURRENCY = 6
+
+
+def build_llm_input(
+    payload: Dict[str, Any], pages: Optional[List[str]] = None, budget: int = DEFAULT_PAGE_TOKEN_BUDGET
+) -> str:
     """
     Provide only the minimum facts needed, to reduce hallucination risk.
-    We pull only page-wise inputs already in the payload.
+    We pull only page-wise inputs already in the payload, compacted and
+    deduplicated, each page within `budget` tokens (see src/llm/facts.py).
+    pages limits the bundle to those pages (meta is always included).
     """
-    meta = payload.get("meta", {}) or {}
-
-    def pick(page_key: str) -> Dict[str, Any]:
-        p = payload.get(page_key, {}) or {}
-        return {
-            "data": p.get("data", {}) or {},
-            "computed": p.get("computed", {}) or {},
-            "narrative_inputs": p.get("narrative_inputs", {}) or {},
-        }
-
-    bundle = {
-        "meta": meta,
-        "page2_exec_snapshot": pick("page2_exec_snapshot"),
-        "page3_liveability": pick("page3_liveability"),
-        "page4_market_snapshot": pick("page4_market_snapshot"),
-        "page5_price_trend": pick("page5_price_trend"),
-        "page6_nearby_comparison": pick("page6_nearby_comparison"),
-        "page7_demand_supply_sale": pick("page7_demand_supply_sale"),
-        "page8_demand_supply_rent": pick("page8_demand_supply_rent"),
-        "page9_propertytype_status": pick("page9_propertytype_status"),
-        "page10_top_projects": pick("page10_top_projects"),
-        "page11_registrations_developers": pick("page11_registrations_developers"),
-        "page12_reviews_conclusion": pick("page12_reviews_conclusion"),
-    }
-    return json.dumps(bundle, ensure_ascii=False, indent=2)
+    return build_fact_bundle(payload, pages or NARRATIVE_PAGES, budget).text
 
 
 INSTRUCTIONS = """You write concise narrative copy for a locality report.
@@ -95,40 +93,312 @@ def _attach_narratives(payload: Dict[str, Any], llm: Dict[str, Any]) -> None:
         computed["narratives"].update(obj)
 
 
+def page_fact_bundle(payload: Dict[str, Any], page_key: str, budget: int = DEFAULT_PAGE_TOKEN_BUDGET) -> FactBundle:
+    """The facts sent with page_key's request."""
+    return build_fact_bundle(payload, NARRATIVE_PAGES if page_key in SUMMARY_PAGES else [page_key], budget)
+
+
+def llm_token_report(payload: Dict[str, Any], budget: int = DEFAULT_PAGE_TOKEN_BUDGET) -> Dict[str, Dict[str, int]]:
+    """Estimated input tokens per page request: {"before": full dump, "after": fact bundle}."""
+    out = {}
+    for page_key in NARRATIVE_PAGES:
+        b = page_fact_bundle(payload, page_key, budget)
+        out[page_key] = {"before": b.tokens_before, "after": b.tokens_after}
+    return out
+
+
+def _plan_pages(
+    payload: Dict[str, Any], model: str, budget: int, previous: Optional[Dict[str, Any]]
+) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, Any]]:
+    """Per page: request input and fingerprint, plus the narratives reusable from `previous`."""
+    inputs = {pk: page_fact_bundle(payload, pk, budget).text for pk in NARRATIVE_PAGES}
+    fps = {pk: fingerprint(INSTRUCTIONS, inputs[pk], page_schema(pk), model) for pk in NARRATIVE_PAGES}
+    reused: Dict[str, Any] = {}
+    if previous is not None:
+        prev_fps = previous.get("narrative_fingerprints") or {}
+        prev_llm = previous.get("narratives") or {}
+        for pk in NARRATIVE_PAGES:
+            if prev_fps.get(pk) == fps[pk] and isinstance(prev_llm.get(pk), dict):
+                reused[pk] = prev_llm[pk]
+    return inputs, fps, reused
+
+
+async def generate_narratives_async(
+    payload: Dict[str, Any],
+    model: Optional[str] = None,
+    cache: Optional[LLMCache] = None,
+    concurrency: int = DEFAULT_LLM_CONCURRENCY,
+    budget: int = DEFAULT_PAGE_TOKEN_BUDGET,
+    previous: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    One structured call per page, at most `concurrency` in flight, so the
+    report takes about as long as its slowest page. A page that still fails
+    after its retries fails alone: the other pages are cached (with a cache)
+    and only the failed ones are requested again on the next run.
+    Each page's request is fingerprinted into payload["narrative_fingerprints"];
+    pages whose fingerprint matches the previous step-5 payload reuse its
+    narrative without a call.
+    """
+    m = model or get_model()
+    inputs, fps, llm = _plan_pages(payload, m, budget, previous)
+    todo = [pk for pk in NARRATIVE_PAGES if pk not in llm]
+    if not todo:
+        _attach_narratives(payload, llm)
+        payload["narrative_fingerprints"] = fps
+        return llm
+
+    sem = asyncio.Semaphore(max(1, concurrency))
+    # a fully cached report needs no API key (call_structured_async reports a missing one on a miss)
+    client = get_async_client() if os.environ.get("OPENAI_API_KEY") else None
+
+    async def one(page_key: str) -> Dict[str, Any]:
+        async with sem:
+            return await call_structured_async(
+                client=client,
+                instructions=INSTRUCTIONS,
+                user_input=inputs[page_key],
+                schema=page_schema(page_key),
+                name=f"narratives_{page_key}",
+                model=m,
+                cache=cache,
+            )
+
+    try:
+        results = await asyncio.gather(*(one(pk) for pk in todo), return_exceptions=True)
+    finally:
+        if client is not None:
+            await client.close()
+
+    failed = []
+    for page_key, res in zip(todo, results):
+        if isinstance(res, BaseException) or not isinstance(res.get(page_key), dict):
+            failed.append(f"{page_key}: {res}")
+            continue
+        llm[page_key] = res[page_key]
+    if failed:
+        raise RuntimeError("Narratives failed for " + "; ".join(failed))
+
+    llm = {pk: llm[pk] for pk in NARRATIVE_PAGES}
+    _attach_narratives(payload, llm)
+    payload["narrative_fingerprints"] = fps
+    return llm
+
+
+def generate_narratives(
+    payload: Dict[str, Any],
+    model: Optional[str] = None,
+    cache: Optional[LLMCache] = None,
+    concurrency: int = DEFAULT_LLM_CONCURRENCY,
+    budget: int = DEFAULT_PAGE_TOKEN_BUDGET,
+    previous: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Calls the LLM on the payload facts and attaches the narratives in place.
+    Returns the structured LLM output ({page_key: {field: text}}).
+    With a cache, page requests identical to an earlier run (facts, instructions,
+    schema, model) are answered from disk without calling the API.
+    budget: estimated input tokens allowed per page of facts.
+    previous: an earlier step-5 payload; only pages whose facts changed since are regenerated.
+    Not for use inside a running event loop (notebooks, async servers): await
+    generate_narratives_async there instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        raise RuntimeError(
+            "generate_narratives() cannot run inside a running event loop; "
+            "use `await generate_narratives_async(...)` instead"
+        )
+    return asyncio.run(
+        generate_narratives_async(
+            payload, model=model, cache=cache, concurrency=concurrency, budget=budget, previous=previous
+        )
+    )
+
+
+# -----------------------
+# Offline batch mode
+# -----------------------
+def batch_custom_id(page_key: str, fp: str) -> str:
+    # content-addressed: results map back to any payload whose page request is identical
+    return f"{page_key}:{fp[:24]}"
+
+
+def build_batch_requests(
+    payload: Dict[str, Any],
+    model: Optional[str] = None,
+    budget: int = DEFAULT_PAGE_TOKEN_BUDGET,
+    previous: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Batch API request lines for the pages of payload that need the model (phase one)."""
+    m = model or get_model()
+    inputs, fps, reused = _plan_pages(payload, m, budget, previous)
+    return [
+        batch_request(
+            custom_id=batch_custom_id(pk, fps[pk]),
+            instructions=INSTRUCTIONS,
+            user_input=inputs[pk],
+            schema=page_schema(pk),
+            name=f"narratives_{pk}",
+            model=m,
+        )
+        for pk in NARRATIVE_PAGES
+        if pk not in reused
+    ]
+
+
+def attach_batch_results(
+    payload: Dict[str, Any],
+    results: Dict[str, Dict[str, Any]],
+    errors: Optional[Dict[str, str]] = None,
+    model: Optional[str] = None,
+    budget: int = DEFAULT_PAGE_TOKEN_BUDGET,
+    previous: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Attaches narratives from parsed batch results (phase two); no network.
+    model/budget/previous must match phase one so the request ids line up.
+    """
+    m = model or get_model()
+    _, fps, llm = _plan_pages(payload, m, budget, previous)
+    failed = []
+    for pk in NARRATIVE_PAGES:
+        if pk in llm:
+            continue
+        cid = batch_custom_id(pk, fps[pk])
+        res = results.get(cid)
+        if isinstance(res, dict) and isinstance(res.get(pk), dict):
+            llm[pk] = res[pk]
+        else:
+            failed.append(f"{pk}: {(errors or {}).get(cid, 'no result for ' + cid)}")
+    if failed:
+        raise RuntimeError("Narratives missing from batch results: " + "; ".join(failed))
+
+    llm = {pk: llm[pk] for pk in NARRATIVE_PAGES}
+    _attach_narratives(payload, llm)
+    payload["narrative_fingerprints"] = fps
+    return llm
+
+
+def _write_jsonl(path: Path, rows: List[Dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+
 def main() -> None:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--in", dest="inp", required=True, help="Path to report_payload_step3.json")
-    ap.add_argument("--outdir", required=True, help="Output directory")
+    ap.add_argument("--in", dest="inp", nargs="+", required=True, help="Path(s) to report_payload_step3.json")
+    ap.add_argument("--outdir", default=None, help="Output directory (default: each input's folder)")
     ap.add_argument("--model", default=None, help="Optional model override (else OPENAI_MODEL/env)")
+    ap.add_argument(
+        "--llm-concurrency", type=int, default=DEFAULT_LLM_CONCURRENCY, help="Per-page LLM requests in flight at once"
+    )
+    ap.add_argument("--pdf-workers", type=int, default=1, help="Render page groups in N processes and merge (needs pypdf)")
+    ap.add_argument(
+        "--token-budget", type=int, default=DEFAULT_PAGE_TOKEN_BUDGET, help="Estimated input tokens allowed per page of facts"
+    )
+    ap.add_argument("--cache-dir", default=DEFAULT_LLM_CACHE_DIR, help="LLM response cache folder")
+    ap.add_argument("--no-cache", action="store_true", help="Neither read nor write the LLM response cache")
+    ap.add_argument(
+        "--refresh", action="store_true", help="Regenerate every page: ignore cached responses and the previous payload"
+    )
+    ap.add_argument(
+        "--previous",
+        default=None,
+        help="Earlier report_payload_step5.json to reuse unchanged pages from (default: the one in the output folder)",
+    )
+    batch = ap.add_mutually_exclusive_group()
+    batch.add_argument(
+        "--batch-emit", default=None, help="Phase one: write Batch API requests (JSONL) for all inputs and stop"
+    )
+    batch.add_argument(
+        "--batch-ingest", default=None, help="Phase two: attach narratives from a Batch API results JSONL, render PDFs"
+    )
     args = ap.parse_args()
 
-    inp = Path(args.inp).expanduser()
-    outdir = Path(args.outdir).expanduser()
-    outdir.mkdir(parents=True, exist_ok=True)
+    inputs = [Path(x).expanduser() for x in args.inp]
+    if len(inputs) > 1 and (args.outdir or args.previous):
+        raise SystemExit("--outdir/--previous take a single --in; with several inputs, outputs go next to each input.")
 
-    payload = _read_json(inp)
-    user_input = build_llm_input(payload)
+    def outdir_for(inp: Path) -> Path:
+        return Path(args.outdir).expanduser() if args.outdir else inp.parent
 
-    llm = call_structured(
-        instructions=INSTRUCTIONS,
-        user_input=user_input,
-        schema=NARRATIVE_SCHEMA,
-        model=args.model,
-    )
+    def previous_for(outdir: Path) -> Optional[Dict[str, Any]]:
+        prev_path = Path(args.previous).expanduser() if args.previous else outdir / "report_payload_step5.json"
+        return _read_json(prev_path) if prev_path.exists() and not args.refresh else None
 
-    _attach_narratives(payload, llm)
+    if args.batch_emit:
+        rows: Dict[str, Dict[str, Any]] = {}
+        for inp in inputs:
+            payload = _read_json(inp)
+            previous = previous_for(outdir_for(inp))
+            for row in build_batch_requests(payload, model=args.model, budget=args.token_budget, previous=previous):
+                rows.setdefault(row["custom_id"], row)  # identical page requests are sent once
+        out = Path(args.batch_emit).expanduser()
+        _write_jsonl(out, list(rows.values()))
+        print("Done.")
+        print(f"Batch requests: {out} ({len(rows)} request(s) for {len(inputs)} payload(s))")
+        print("Submit it to the Batch API, then re-run with --batch-ingest <results.jsonl>.")
+        return
+
+    results: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+    if args.batch_ingest:
+        results, errors = read_batch_results(Path(args.batch_ingest).expanduser())
+        print(f"Batch results: {len(results)} ok, {len(errors)} failed")
+        for cid, err in errors.items():
+            print(f"  {cid}: {err}")
+    cache = None
+    if not args.no_cache and not args.batch_ingest:
+        cache = LLMCache(Path(args.cache_dir).expanduser(), refresh=args.refresh)
 
-    step5_payload = outdir / "report_payload_step5.json"
-    _write_json(step5_payload, payload)
+    for inp in inputs:
+        outdir = outdir_for(inp)
+        outdir.mkdir(parents=True, exist_ok=True)
+        payload = _read_json(inp)
+        previous = previous_for(outdir)
+        tokens = llm_token_report(payload, args.token_budget)
+        if args.batch_ingest:
+            attach_batch_results(
+                payload, results, errors, model=args.model, budget=args.token_budget, previous=previous
+            )
+        else:
+            generate_narratives(
+                payload,
+                model=args.model,
+                cache=cache,
+                concurrency=args.llm_concurrency,
+                budget=args.token_budget,
+                previous=previous,
+            )
+        step5_payload = outdir / "report_payload_step5.json"
+        _write_json(step5_payload, payload)
 
-    locality = (payload.get("meta", {}) or {}).get("locality", "Locality")
-    out_pdf = outdir / f"{locality} Locality Report - Final.pdf"
-    render_pdf(payload, out_pdf)
+        locality = (payload.get("meta", {}) or {}).get("locality", "Locality")
+        out_pdf = outdir / f"{locality} Locality Report - Final.pdf"
+        render_pdf(payload, out_pdf, page_workers=args.pdf_workers)
 
-    print("Done.")
-    print(f"Step5 payload: {step5_payload}")
-    print(f"Final PDF: {out_pdf}")
+        print("Done.")
+        print(f"Step5 payload: {step5_payload}")
+        print(f"Final PDF: {out_pdf}")
+        print("LLM input tokens (estimated, before -> after):")
+        for page_key, t in tokens.items():
+            print(f"  {page_key}: {t['before']} -> {t['after']}")
+        print(
+            f"  total: {sum(t['before'] for t in tokens.values())} -> {sum(t['after'] for t in tokens.values())}"
+        )
+        prev_fps = (previous or {}).get("narrative_fingerprints") or {}
+        changed = [pk for pk, fp in payload["narrative_fingerprints"].items() if prev_fps.get(pk) != fp]
+        print(f"Narratives: {len(changed)} page(s) regenerated, {len(NARRATIVE_PAGES) - len(changed)} reused")
+    if cache is not None:
+        st = cache.stats()
+        print(f"LLM cache: {st['hits']} hit/{st['misses']} miss ({st['expired']} expired, {st['evictions']} evicted)")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import copy
 import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.utils.build_cache import code_version, fingerprint
+from src.utils.json_path import compile_query
 
 
 MONTHS = {
@@ -193,12 +197,49 @@ def compute_price_trend_summary(price_trend: List[Dict[str, Any]]) -> Dict[str,
     }
 
 
-def compute_exec_snapshot(payload: Dict[str, Any]) -> Dict[str, Any]:
+class ComputeContext:
+    """
+    Per-payload memo for derived artifacts that several pages share
+    (price-trend summary, demand/supply gap tables). Each artifact is computed
+    on first use; later uses are counted as hits. Every call returns a deep
+    copy, so one page cannot mutate another page's data.
+    """
+
+    def __init__(self, payload: Dict[str, Any]) -> None:
+        self.payload = payload
+        self._memo: Dict[Any, Any] = {}
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    def _get(self, name: str, key: Any, fn: Callable[[], Any]) -> Any:
+        if key in self._memo:
+            self.hits[name] = self.hits.get(name, 0) + 1
+        else:
+            self.misses[name] = self.misses.get(name, 0) + 1
+            self._memo[key] = fn()
+        return copy.deepcopy(self._memo[key])
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        names = sorted(set(self.hits) | set(self.misses))
+        return {n: {"hits": self.hits.get(n, 0), "misses": self.misses.get(n, 0)} for n in names}
+
+    def trend_summary(self) -> Dict[str, Any]:
+        j2 = self.payload["sources"]["json2_rates"]
+        return self._get("trend_summary", "trend_summary", lambda: compute_price_trend_summary(j2.get("priceTrend") or []))
+
+    def gap_table(self, side: str, segment: str) -> List[Dict[str, Any]]:
+        """side = "sale"/"rent"; segment = "unitType"/"propertyType"/"totalPrice_range"."""
+        j1 = self.payload["sources"]["json1_locality"]
+        ds = (j1.get("demandSupply") or {}).get(side) or {}
+        return self._get("gap_table", ("gap_table", side, segment), lambda: compute_gap_table(ds.get(segment) or []))
+
+
+def compute_exec_snapshot(payload: Dict[str, Any], ctx: Optional[ComputeContext] = None) -> Dict[str, Any]:
+    ctx = ctx or ComputeContext(payload)
     j1 = payload["sources"]["json1_locality"]
     j2 = payload["sources"]["json2_rates"]
 
     market_overview = j2.get("marketOverview") or {}
-    price_trend = j2.get("priceTrend") or []
     rr_data = j1.get("ratingReviewData") or {}
     rental_stats = j1.get("rentalStats") or {}
     demand_supply = j1.get("demandSupply") or {}
@@ -217,27 +258,24 @@ def compute_exec_snapshot(payload: Dict[str, Any]) -> Dict[str, Any]:
         "rent_pct": (rent_total / total * 100.0) if total else None,
     }
 
-    trend = compute_price_trend_summary(price_trend)
+    trend = ctx.trend_summary()
     sparkline = [{"x": p["quarterName"], "y": p["locationRate"]} for p in trend["points"]]
 
     # Demand-supply highlights (pick biggest absolute gap from each sale segment)
-    def biggest_gap(items: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
-        g = compute_gap_table(items)
+    def biggest_gap(side: str, segment: str) -> Optional[Dict[str, Any]]:
+        g = ctx.gap_table(side, segment)
         valid = [r for r in g if isinstance(r.get("gap"), (int, float))]
         if not valid:
             return None
         return sorted(valid, key=lambda x: abs(x["gap"]), reverse=True)[0]
 
-    sale = demand_supply.get("sale") or {}
-    rent = demand_supply.get("rent") or {}
-
     highlights = {
-        "sale_unitType_biggest_gap": biggest_gap(sale.get("unitType") or []),
-        "sale_propertyType_biggest_gap": biggest_gap(sale.get("propertyType") or []),
-        "sale_priceBand_biggest_gap": biggest_gap(sale.get("totalPrice_range") or []),
-        "rent_unitType_biggest_gap": biggest_gap(rent.get("unitType") or []),
-        "rent_propertyType_biggest_gap": biggest_gap(rent.get("propertyType") or []),
-        "rent_priceBand_biggest_gap": biggest_gap(rent.get("totalPrice_range") or []),
+        "sale_unitType_biggest_gap": biggest_gap("sale", "unitType"),
+        "sale_propertyType_biggest_gap": biggest_gap("sale", "propertyType"),
+        "sale_priceBand_biggest_gap": biggest_gap("sale", "totalPrice_range"),
+        "rent_unitType_biggest_gap": biggest_gap("rent", "unitType"),
+        "rent_propertyType_biggest_gap": biggest_gap("rent", "propertyType"),
+        "rent_priceBand_biggest_gap": biggest_gap("rent", "totalPrice_range"),
     }
 
     return {
@@ -346,16 +384,16 @@ def compute_nearby_comparison(payload: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def compute_demand_supply_segments(payload: Dict[str, Any], side: str) -> Dict[str, Any]:
+def compute_demand_supply_segments(
+    payload: Dict[str, Any], side: str, ctx: Optional[ComputeContext] = None
+) -> Dict[str, Any]:
     """
     side = "sale" or "rent"
     """
-    j1 = payload["sources"]["json1_locality"]
-    ds = (j1.get("demandSupply") or {}).get(side) or {}
-
-    unit = compute_gap_table(ds.get("unitType") or [])
-    ptype = compute_gap_table(ds.get("propertyType") or [])
-    band = compute_gap_table(ds.get("totalPrice_range") or [])
+    ctx = ctx or ComputeContext(payload)
+    unit = ctx.gap_table(side, "unitType")
+    ptype = ctx.gap_table(side, "propertyType")
+    band = ctx.gap_table(side, "totalPrice_range")
 
     return {
         "unitType": {
@@ -564,88 +602,198 @@ def compute_report_period(payload: Dict[str, Any]) -> Optional[str]:
     return None
 
 
-def compute_step2(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+# Payload paths each page's step-2 block reads (directly or via shared results).
+PAGE_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "page1_cover": (
+        "meta.locality",
+        "meta.city",
+        "meta.micromarket",
+        "sources.json1_locality.govtRegistration",
+        "sources.json1_locality.recentTransactions",
+        "sources.json2_rates.govtRegistration",
+    ),
+    "page2_exec_snapshot": (
+        "sources.json1_locality.ratingReviewData",
+        "sources.json1_locality.rentalStats",
+        "sources.json1_locality.demandSupply",
+        "sources.json2_rates.marketOverview",
+        "sources.json2_rates.priceTrend",
+    ),
+    "page3_liveability": ("sources.json1_locality.indices",),
+    "page4_market_snapshot": (
+        "sources.json1_locality.marketSupply",
+        "sources.json1_locality.rentalStats",
+    ),
+    "page5_price_trend": ("sources.json2_rates.priceTrend",),
+    "page6_nearby_comparison": ("meta.locality", "sources.json2_rates.locationRates"),
+    "page7_demand_supply_sale": ("sources.json1_locality.demandSupply",),
+    "page8_demand_supply_rent": ("sources.json1_locality.demandSupply",),
+    "page9_propertytype_status": (
+        "sources.json2_rates.propertyTypes",
+        "sources.json2_rates.propertyStatus",
+    ),
+    "page10_top_projects": ("sources.json2_rates.topProjects",),
+    "page11_registrations_developers": (
+        "sources.json1_locality.govtRegistration",
+        "sources.json1_locality.recentTransactions",
+        "sources.json2_rates.govtRegistration",
+        "sources.json2_rates.topDevelopers",
+    ),
+    "page12_reviews_conclusion": (
+        "sources.json1_locality.ratingReviewData",
+        "sources.json1_locality.ratingReview",
+        # narrative_inputs reuse page 5 trend + page 7/8 gaps
+        "sources.json2_rates.priceTrend",
+        "sources.json1_locality.demandSupply",
+    ),
+}
+
+
+def dependency_fingerprints(payload: Dict[str, Any]) -> Dict[str, str]:
+    """{dependency path: content hash} for every path in PAGE_DEPENDENCIES."""
+    paths = tuple(dict.fromkeys(p for deps in PAGE_DEPENDENCIES.values() for p in deps))
+    return {p: fingerprint(v) for p, v in compile_query(paths).values(payload).items()}
+
+
+def changed_pages(previous: Dict[str, Any], payload: Dict[str, Any]) -> List[str]:
+    """Pages whose declared source blocks differ between two payloads."""
+    before = dependency_fingerprints(previous)
+    after = dependency_fingerprints(payload)
+    return [page for page, deps in PAGE_DEPENDENCIES.items() if any(before[d] != after[d] for d in deps)]
+
+
+def _without_narratives(block: Dict[str, Any]) -> Dict[str, Any]:
+    # step-5 keeps a narratives backup under computed; that is not step-2 output
+    return {k: v for k, v in block.items() if k != "narratives"}
+
+
+def compute_step2(
+    payload: Dict[str, Any], previous: Optional[Dict[str, Any]] = None
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     """
     Returns:
       - updated_payload (same architecture)
       - step2_quality_report
+
+    previous: optional earlier step-2 (or later) payload. Pages whose
+    PAGE_DEPENDENCIES are unchanged reuse its computed/narrative_inputs;
+    only the others are recomputed. Nothing is reused unless previous was
+    computed by the same code (meta.step2_code_version).
     """
     updated = dict(payload)  # shallow copy ok; we mutate per-page dicts
     step2_warnings: List[Dict[str, Any]] = []
+    code = code_version(__name__)
+    updated["meta"] = {**(payload.get("meta") or {}), "step2_code_version": code}
+
+    ctx = ComputeContext(payload)
+    same_code = previous is not None and (previous.get("meta") or {}).get("step2_code_version") == code
+    if previous is not None and not same_code:
+        step2_warnings.append({
+            "level": "warning",
+            "code": "previous_code_changed",
+            "message": "The previous payload was computed by other step-2 code; every page is recomputed.",
+            "path": "meta.step2_code_version",
+        })
+    todo = set(changed_pages(previous, payload)) if same_code else set(PAGE_DEPENDENCIES)
+    reused: List[str] = []
+
+    def carry(page_key: str) -> bool:
+        """Reuse the previous page block if its inputs did not change."""
+        if page_key in todo:
+            return False
+        prev = (previous or {}).get(page_key) or {}
+        if "computed" not in prev:
+            return False
+        updated[page_key]["computed"] = _without_narratives(prev["computed"])
+        ni = dict(prev.get("narrative_inputs") or {})
+        if isinstance(ni.get("llm_facts"), dict):
+            ni["llm_facts"] = _without_narratives(ni["llm_facts"])
+        updated[page_key]["narrative_inputs"] = ni
+        reused.append(page_key)
+        return True
 
     # Report period label goes to cover + page11 as well
-    period = compute_report_period(payload)
-    updated["page1_cover"]["computed"] = {"report_period_label": period}
-    updated["page1_cover"]["narrative_inputs"] = {
-        "tagline_template_vars": {
-            "locality": payload.get("meta", {}).get("locality"),
-            "city": payload.get("meta", {}).get("city"),
-            "micromarket": payload.get("meta", {}).get("micromarket"),
-            "report_period_label": period,
+    if not carry("page1_cover"):
+        period = compute_report_period(payload)
+        updated["page1_cover"]["computed"] = {"report_period_label": period}
+        updated["page1_cover"]["narrative_inputs"] = {
+            "tagline_template_vars": {
+                "locality": payload.get("meta", {}).get("locality"),
+                "city": payload.get("meta", {}).get("city"),
+                "micromarket": payload.get("meta", {}).get("micromarket"),
+                "report_period_label": period,
+            }
         }
-    }
 
     # Page 2
-    updated["page2_exec_snapshot"]["computed"] = compute_exec_snapshot(payload)
-    updated["page2_exec_snapshot"]["narrative_inputs"] = {
-        "llm_facts": {
-            "trend_total_change_pct_locality": updated["page2_exec_snapshot"]["computed"]["trend_summary"]["total_change_pct_locality"],
-            "trend_total_change_pct_micromarket": updated["page2_exec_snapshot"]["computed"]["trend_summary"]["total_change_pct_micromarket"],
-            "biggest_sale_gap": updated["page2_exec_snapshot"]["computed"]["highlights"]["sale_unitType_biggest_gap"],
-            "biggest_rent_gap": updated["page2_exec_snapshot"]["computed"]["highlights"]["rent_unitType_biggest_gap"],
+    if not carry("page2_exec_snapshot"):
+        updated["page2_exec_snapshot"]["computed"] = compute_exec_snapshot(payload, ctx)
+        updated["page2_exec_snapshot"]["narrative_inputs"] = {
+            "llm_facts": {
+                "trend_total_change_pct_locality": updated["page2_exec_snapshot"]["computed"]["trend_summary"]["total_change_pct_locality"],
+                "trend_total_change_pct_micromarket": updated["page2_exec_snapshot"]["computed"]["trend_summary"]["total_change_pct_micromarket"],
+                "biggest_sale_gap": updated["page2_exec_snapshot"]["computed"]["highlights"]["sale_unitType_biggest_gap"],
+                "biggest_rent_gap": updated["page2_exec_snapshot"]["computed"]["highlights"]["rent_unitType_biggest_gap"],
+            }
         }
-    }
 
     # Page 3
-    updated["page3_liveability"]["computed"] = compute_liveability(payload)
-    updated["page3_liveability"]["narrative_inputs"] = {
-        "llm_facts": {"index_cards": updated["page3_liveability"]["computed"]["index_cards"]}
-    }
+    if not carry("page3_liveability"):
+        updated["page3_liveability"]["computed"] = compute_liveability(payload)
+        updated["page3_liveability"]["narrative_inputs"] = {
+            "llm_facts": {"index_cards": updated["page3_liveability"]["computed"]["index_cards"]}
+        }
 
     # Page 4
-    updated["page4_market_snapshot"]["computed"] = compute_market_snapshot(payload)
-    updated["page4_market_snapshot"]["narrative_inputs"] = {
-        "llm_facts": {
-            "marketSupply_meta": updated["page4_market_snapshot"]["computed"]["marketSupply_meta"],
-            "rent_by_bhk": updated["page4_market_snapshot"]["computed"]["rent_by_bhk"],
+    if not carry("page4_market_snapshot"):
+        updated["page4_market_snapshot"]["computed"] = compute_market_snapshot(payload)
+        updated["page4_market_snapshot"]["narrative_inputs"] = {
+            "llm_facts": {
+                "marketSupply_meta": updated["page4_market_snapshot"]["computed"]["marketSupply_meta"],
+                "rent_by_bhk": updated["page4_market_snapshot"]["computed"]["rent_by_bhk"],
+            }
         }
-    }
 
     # Page 5
-    j2 = payload["sources"]["json2_rates"]
-    trend = compute_price_trend_summary(j2.get("priceTrend") or [])
-    updated["page5_price_trend"]["computed"] = trend
-    updated["page5_price_trend"]["narrative_inputs"] = {"llm_facts": trend}
+    if not carry("page5_price_trend"):
+        trend = ctx.trend_summary()
+        updated["page5_price_trend"]["computed"] = trend
+        updated["page5_price_trend"]["narrative_inputs"] = {"llm_facts": trend}
 
     # Page 6
-    comp = compute_nearby_comparison(payload)
-    updated["page6_nearby_comparison"]["computed"] = comp
-    updated["page6_nearby_comparison"]["narrative_inputs"] = {"llm_facts": {"comparison_rows_top": comp["comparison_rows_top"]}}
+    if not carry("page6_nearby_comparison"):
+        comp = compute_nearby_comparison(payload)
+        updated["page6_nearby_comparison"]["computed"] = comp
+        updated["page6_nearby_comparison"]["narrative_inputs"] = {"llm_facts": {"comparison_rows_top": comp["comparison_rows_top"]}}
 
     # Page 7/8
-    sale_seg = compute_demand_supply_segments(payload, "sale")
-    rent_seg = compute_demand_supply_segments(payload, "rent")
-
-    updated["page7_demand_supply_sale"]["computed"] = sale_seg
-    updated["page7_demand_supply_sale"]["narrative_inputs"] = {"llm_facts": sale_seg}
+    if not carry("page7_demand_supply_sale"):
+        sale_seg = compute_demand_supply_segments(payload, "sale", ctx)
+        updated["page7_demand_supply_sale"]["computed"] = sale_seg
+        updated["page7_demand_supply_sale"]["narrative_inputs"] = {"llm_facts": sale_seg}
 
-    updated["page8_demand_supply_rent"]["computed"] = rent_seg
-    updated["page8_demand_supply_rent"]["narrative_inputs"] = {"llm_facts": rent_seg}
+    if not carry("page8_demand_supply_rent"):
+        rent_seg = compute_demand_supply_segments(payload, "rent", ctx)
+        updated["page8_demand_supply_rent"]["computed"] = rent_seg
+        updated["page8_demand_supply_rent"]["narrative_inputs"] = {"llm_facts": rent_seg}
 
     # Page 9
-    ps = compute_propertytype_status(payload)
-    updated["page9_propertytype_status"]["computed"] = ps
-    updated["page9_propertytype_status"]["narrative_inputs"] = {"llm_facts": ps}
+    if not carry("page9_propertytype_status"):
+        ps = compute_propertytype_status(payload)
+        updated["page9_propertytype_status"]["computed"] = ps
+        updated["page9_propertytype_status"]["narrative_inputs"] = {"llm_facts": ps}
 
     # Page 10
-    tp = compute_top_projects(payload)
-    updated["page10_top_projects"]["computed"] = tp
-    updated["page10_top_projects"]["narrative_inputs"] = {"llm_facts": tp}
+    if not carry("page10_top_projects"):
+        tp = compute_top_projects(payload)
+        updated["page10_top_projects"]["computed"] = tp
+        updated["page10_top_projects"]["narrative_inputs"] = {"llm_facts": tp}
 
     # Page 11
-    reg = compute_registrations_developers(payload)
-    updated["page11_registrations_developers"]["computed"] = reg
-    updated["page11_registrations_developers"]["narrative_inputs"] = {"llm_facts": reg}
+    if not carry("page11_registrations_developers"):
+        reg = compute_registrations_developers(payload)
+        updated["page11_registrations_developers"]["computed"] = reg
+        updated["page11_registrations_developers"]["narrative_inputs"] = {"llm_facts": reg}
 
     # Warn if topDevelopers.byValue absent (your step1 already flagged this)
     top_dev = (payload["sources"]["json2_rates"].get("topDevelopers") or {})
@@ -657,19 +805,23 @@ def compute_step2(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, An
             "path": "sources.json2_rates.topDevelopers.byValue",
         })
 
-    # Page 12
-    rev = compute_reviews_conclusion(payload)
-    updated["page12_reviews_conclusion"]["computed"] = rev
-    updated["page12_reviews_conclusion"]["narrative_inputs"] = {
-        "llm_facts": {
-            "rating_snapshot": rev["rating_snapshot"],
-            "pros": rev["pros"],
-            "cons": rev["cons"],
-            "trend_total_change_pct_locality": trend.get("total_change_pct_locality"),
-            "sale_top_under_supply": sale_seg["unitType"]["top_gaps"]["under_supplied"],
-            "rent_top_under_supply": rent_seg["unitType"]["top_gaps"]["under_supplied"],
+    # Page 12 (facts reuse the page 5 trend + page 7/8 gaps, fresh or carried over)
+    if not carry("page12_reviews_conclusion"):
+        trend = updated["page5_price_trend"]["computed"]
+        sale_seg = updated["page7_demand_supply_sale"]["computed"]
+        rent_seg = updated["page8_demand_supply_rent"]["computed"]
+        rev = compute_reviews_conclusion(payload)
+        updated["page12_reviews_conclusion"]["computed"] = rev
+        updated["page12_reviews_conclusion"]["narrative_inputs"] = {
+            "llm_facts": {
+                "rating_snapshot": rev["rating_snapshot"],
+                "pros": rev["pros"],
+                "cons": rev["cons"],
+                "trend_total_change_pct_locality": trend.get("total_change_pct_locality"),
+                "sale_top_under_supply": sale_seg["unitType"]["top_gaps"]["under_supplied"],
+                "rent_top_under_supply": rent_seg["unitType"]["top_gaps"]["under_supplied"],
+            }
         }
-    }
 
     summary = {
         "computed_summary": {
@@ -686,6 +838,13 @@ def compute_step2(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, An
         "stage": "step2_compute",
         "warnings": step2_warnings,
         "summary": summary,
+        "context_cache": ctx.stats(),
     }
+    if previous is not None:
+        quality["incremental"] = {
+            "previous_code_matches": same_code,
+            "recomputed_pages": [p for p in PAGE_DEPENDENCIES if p not in reused],
+            "reused_pages": reused,
+        }
 
     return updated, quality
\ No newline at end of file
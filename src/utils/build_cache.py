@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import ast
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+
+def canonical_json(obj: Any) -> bytes:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def fingerprint(*parts: Any) -> str:
+    """sha256 over parts; bytes are hashed as-is, everything else as canonical JSON."""
+    h = hashlib.sha256()
+    for part in parts:
+        data = part if isinstance(part, bytes) else canonical_json(part)
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+def payload_fingerprint(payload: Dict[str, Any]) -> str:
+    """Content hash of a report payload, ignoring the volatile meta.generated_at."""
+    meta = dict(payload.get("meta") or {})
+    meta.pop("generated_at", None)
+    return fingerprint({**payload, "meta": meta})
+
+
+def _module_imports(name: str, source: bytes) -> List[str]:
+    """
+    Modules of the same top-level package that `name` imports at module level.
+    Imports inside functions are lazy (e.g. an optional chart backend) and
+    are not followed.
+    """
+    package = name.split(".")[0]
+    out: List[str] = []
+    stack = list(ast.parse(source).body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        if isinstance(node, ast.Import):
+            out.extend(a.name for a in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            out.append(node.module)
+            mod = importlib.import_module(node.module)
+            # `from pkg import submodule`
+            out.extend(
+                f"{node.module}.{a.name}" for a in node.names if isinstance(getattr(mod, a.name, None), ModuleType)
+            )
+        else:
+            stack.extend(ast.iter_child_nodes(node))
+    return [m for m in out if m.split(".")[0] == package]
+
+
+@lru_cache(maxsize=None)
+def code_version(*modules: str) -> str:
+    """
+    Hash of the source files of the given modules and of every module of their
+    own package they import, transitively (changes when any of that code does).
+    """
+    h = hashlib.sha256()
+    seen = set()
+    todo = list(modules)
+    while todo:
+        name = todo.pop(0)
+        if name in seen:
+            continue
+        seen.add(name)
+        mod = importlib.import_module(name)
+        src = getattr(mod, "__file__", None)
+        h.update(name.encode("utf-8"))
+        if src:
+            source = Path(src).read_bytes()
+            h.update(source)
+            todo.extend(_module_imports(name, source))
+        else:
+            h.update(str(getattr(mod, "__version__", "")).encode("utf-8"))
+    return h.hexdigest()
+
+
+class BuildCache:
+    """
+    Content-addressed stage cache on local disk:
+      <root>/<stage>/<key[:2]>/<key>.json   JSON results
+      <root>/<stage>/<key[:2]>/<key>/       file artifacts (PNGs, PDFs)
+    Writes go to a temp name and are renamed into place, so concurrent batch
+    workers never see partial entries.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    def _base(self, stage: str, key: str) -> Path:
+        return self.root / stage / key[:2] / key
+
+    def _count(self, stage: str, hit: bool) -> None:
+        d = self.hits if hit else self.misses
+        d[stage] = d.get(stage, 0) + 1
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        stages = sorted(set(self.hits) | set(self.misses))
+        return {s: {"hits": self.hits.get(s, 0), "misses": self.misses.get(s, 0)} for s in stages}
+
+    # ---- JSON results ----
+    def get_json(self, stage: str, key: str) -> Optional[Any]:
+        p = self._base(stage, key).with_suffix(".json")
+        try:
+            obj = json.loads(p.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._count(stage, False)
+            return None
+        self._count(stage, True)
+        return obj
+
+    def put_json(self, stage: str, key: str, obj: Any) -> None:
+        p = self._base(stage, key).with_suffix(".json")
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(f".{p.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_text(json.dumps(obj, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, p)
+
+    # ---- file artifacts ----
+    def get_files(self, stage: str, key: str, dest_dir: Path) -> Optional[Dict[str, str]]:
+        """
+        Copies the cached files for key into dest_dir.
+        Returns {name: restored_path} or None on a miss.
+        """
+        base = self._base(stage, key)
+        manifest = base / "manifest.json"
+        try:
+            names = json.loads(manifest.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._count(stage, False)
+            return None
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        out: Dict[str, str] = {}
+        try:
+            for name, fname in names.items():
+                dst = dest_dir / fname
+                dst.unlink(missing_ok=True)  # may be a hard link into the chart cache
+                shutil.copyfile(base / fname, dst)
+                out[name] = str(dst)
+        except OSError:
+            # files missing or unreadable (cleaned up by hand, disk full): a miss;
+            # drop the entry so the next put_files can store it again
+            shutil.rmtree(base, ignore_errors=True)
+            self._count(stage, False)
+            return None
+        self._count(stage, True)
+        return out
+
+    def put_files(self, stage: str, key: str, files: Dict[str, str]) -> None:
+        """files: {name: path}; each file is stored under its basename."""
+        base = self._base(stage, key)
+        if (base / "manifest.json").exists():
+            return
+        tmp = base.with_name(f".{base.name}.{uuid.uuid4().hex}.tmp")
+        tmp.mkdir(parents=True, exist_ok=True)
+        names: Dict[str, str] = {}
+        for name, path in files.items():
+            src = Path(path)
+            if not src.exists():
+                continue
+            shutil.copyfile(src, tmp / src.name)
+            names[name] = src.name
+        (tmp / "manifest.json").write_text(json.dumps(names, ensure_ascii=False), encoding="utf-8")
+        try:
+            os.replace(tmp, base)
+        except OSError:
+            # another worker stored the same key first
+            shutil.rmtree(tmp, ignore_errors=True)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+Token = Union[str, int]
+
+
+def parse_path(path: str) -> Tuple[Token, ...]:
+    """
+    Tokenizes paths like:
+      "a.b.c"     -> ("a", "b", "c")
+      "a.b[0].c"  -> ("a", "b", 0, "c")
+      "a[2][1]"   -> ("a", 2, 1)
+    Raises ValueError on malformed brackets / non-integer indices.
+    """
+    tokens: List[Token] = []
+    i = 0
+    buf = ""
+    while i < len(path):
+        ch = path[i]
+        if ch == ".":
+            if buf:
+                tokens.append(buf)
+                buf = ""
+            i += 1
+            continue
+        if ch == "[":
+            if buf:
+                tokens.append(buf)
+                buf = ""
+            j = path.find("]", i)
+            if j == -1:
+                raise ValueError(f"Unclosed bracket in path: {path}")
+            idx_str = path[i + 1 : j].strip()
+            if not idx_str.isdigit():
+                raise ValueError(f"Non-integer index in path: {path}")
+            tokens.append(int(idx_str))
+            i = j + 1
+            continue
+        buf += ch
+        i += 1
+    if buf:
+        tokens.append(buf)
+    return tuple(tokens)
+
+
+def _step(cur: Any, tok: Token) -> Tuple[bool, Any]:
+    if isinstance(tok, int):
+        if not isinstance(cur, list) or tok < 0 or tok >= len(cur):
+            return False, None
+        return True, cur[tok]
+    if not isinstance(cur, dict) or tok not in cur:
+        return False, None
+    return True, cur[tok]
+
+
+@dataclass(frozen=True)
+class CompiledPath:
+    path: str
+    tokens: Tuple[Token, ...]
+
+    def get(self, obj: Any) -> Tuple[bool, Any]:
+        """Returns: (found, value)"""
+        cur = obj
+        for tok in self.tokens:
+            ok, cur = _step(cur, tok)
+            if not ok:
+                return False, None
+        return True, cur
+
+    def value(self, obj: Any, default: Any = None) -> Any:
+        found, v = self.get(obj)
+        return v if found else default
+
+
+@lru_cache(maxsize=1024)
+def compile_path(path: str) -> CompiledPath:
+    return CompiledPath(path=path, tokens=parse_path(path))
+
+
+@dataclass
+class _Node:
+    children: Dict[Token, "_Node"] = field(default_factory=dict)
+    ends: List[str] = field(default_factory=list)  # paths terminating here
+    below: List[str] = field(default_factory=list)  # paths terminating here or deeper
+
+
+class PathQuery:
+    """
+    A set of paths compiled into a shared-prefix trie.
+    evaluate() walks each prefix once, so N paths under "data.insightsData"
+    cost one lookup of "data" and "insightsData" instead of N.
+    Malformed paths are reported as not found (same as get_at_path).
+    """
+
+    def __init__(self, paths: Iterable[str]) -> None:
+        self.paths: Tuple[str, ...] = tuple(dict.fromkeys(paths))
+        self._root = _Node()
+        self._invalid: List[str] = []
+        for p in self.paths:
+            try:
+                tokens = compile_path(p).tokens
+            except ValueError:
+                self._invalid.append(p)
+                continue
+            node = self._root
+            node.below.append(p)
+            for tok in tokens:
+                node = node.children.setdefault(tok, _Node())
+                node.below.append(p)
+            node.ends.append(p)
+
+    def evaluate(self, obj: Any) -> Dict[str, Tuple[bool, Any]]:
+        """Returns {path: (found, value)} for every path in the query."""
+        out: Dict[str, Tuple[bool, Any]] = {p: (False, None) for p in self._invalid}
+        self._walk(self._root, obj, out)
+        return out
+
+    def values(self, obj: Any) -> Dict[str, Any]:
+        """Like evaluate(), but missing paths map to None."""
+        return {p: v for p, (_, v) in self.evaluate(obj).items()}
+
+    def _walk(self, node: _Node, cur: Any, out: Dict[str, Tuple[bool, Any]]) -> None:
+        for p in node.ends:
+            out[p] = (True, cur)
+        for tok, child in node.children.items():
+            ok, nxt = _step(cur, tok)
+            if ok:
+                self._walk(child, nxt, out)
+            else:
+                for p in child.below:
+                    out[p] = (False, None)
+
+
+@lru_cache(maxsize=128)
+def compile_query(paths: Tuple[str, ...]) -> PathQuery:
+    return PathQuery(paths)
@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+from src.utils.json_path import compile_path, compile_query
+
 
 Json = Dict[str, Any]
 
@@ -22,35 +24,7 @@ def _parse_path(path: str) -> List[Union[str, int]]:
       "a.b[0].c"
       "a[2]"
     """
-    tokens: List[Union[str, int]] = []
-    i = 0
-    buf = ""
-    while i < len(path):
-        ch = path[i]
-        if ch == ".":
-            if buf:
-                tokens.append(buf)
-                buf = ""
-            i += 1
-            continue
-        if ch == "[":
-            if buf:
-                tokens.append(buf)
-                buf = ""
-            j = path.find("]", i)
-            if j == -1:
-                raise ValueError(f"Unclosed bracket in path: {path}")
-            idx_str = path[i + 1 : j].strip()
-            if not idx_str.isdigit():
-                raise ValueError(f"Non-integer index in path: {path}")
-            tokens.append(int(idx_str))
-            i = j + 1
-            continue
-        buf += ch
-        i += 1
-    if buf:
-        tokens.append(buf)
-    return tokens
+    return list(compile_path(path).tokens)
 
 
 def get_at_path(obj: Any, path: str) -> Tuple[bool, Any]:
@@ -58,21 +32,10 @@ def get_at_path(obj: Any, path: str) -> Tuple[bool, Any]:
     Returns: (found, value)
     """
     try:
-        tokens = _parse_path(path)
+        compiled = compile_path(path)
     except Exception:
         return False, None
-
-    cur = obj
-    for t in tokens:
-        if isinstance(t, int):
-            if not isinstance(cur, list) or t < 0 or t >= len(cur):
-                return False, None
-            cur = cur[t]
-        else:
-            if not isinstance(cur, dict) or t not in cur:
-                return False, None
-            cur = cur[t]
-    return True, cur
+    return compiled.get(obj)
 
 
 def type_name(v: Any) -> str:
@@ -88,8 +51,9 @@ def validate_required_paths(
     label: str
 ) -> List[Issue]:
     issues: List[Issue] = []
+    found_at = compile_query(tuple(p for p, _ in required)).evaluate(root)
     for path, expected_type in required:
-        found, value = get_at_path(root, path)
+        found, value = found_at[path]
         if not found:
             issues.append(Issue(
                 level="error",
@@ -120,8 +84,9 @@ def validate_optional_paths(
     Optional: missing => warn, type mismatch => warn
     """
     issues: List[Issue] = []
+    found_at = compile_query(tuple(p for p, _ in optional)).evaluate(root)
     for path, expected_type in optional:
-        found, value = get_at_path(root, path)
+        found, value = found_at[path]
         if not found:
             issues.append(Issue(
                 level="warn",
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from src.llm.openai_client import read_batch_results
+from src.llm.schema import NARRATIVE_PAGES, NARRATIVE_SCHEMA
+from src.main import build_report_payload, load_inputs
+from src.step5_llm import attach_batch_results, build_batch_requests
+from src.transform.compute_pages import compute_step2
+from src.transform.ingest import ingest_inputs
+
+# Two-phase Batch API mode end to end, offline: requests are built from a
+# payload computed from the sample data, results are a hand-written JSONL.
+
+ROOT = Path(__file__).resolve().parents[1]
+JSON1 = ROOT / "data" / "Andheri East Locality.json"
+JSON2 = ROOT / "data" / "Andheri East Property Rates.json"
+MODEL = "test-model"
+
+
+@pytest.fixture(scope="module")
+def payload() -> Dict[str, Any]:
+    json1, json2 = load_inputs(str(JSON1), str(JSON2))
+    step1 = build_report_payload(ingest_inputs(json1, json2)["sources"])
+    step2, _ = compute_step2(step1)
+    step2["charts"] = {}  # no chart files: pages render their placeholders
+    return step2
+
+
+def _narrative(page_key: str) -> Dict[str, Dict[str, str]]:
+    fields = NARRATIVE_SCHEMA["properties"][page_key]["properties"]
+    return {page_key: {f: f"{page_key} {f} copy" for f in fields}}
+
+
+def _ok_line(custom_id: Optional[str], page_key: str) -> Dict[str, Any]:
+    line: Dict[str, Any] = {
+        "id": f"batch_req_{page_key}",
+        "response": {
+            "status_code": 200,
+            "body": {
+                "output": [
+                    {"type": "message", "content": [{"type": "output_text", "text": json.dumps(_narrative(page_key))}]}
+                ]
+            },
+        },
+        "error": None,
+    }
+    if custom_id is not None:
+        line["custom_id"] = custom_id
+    return line
+
+
+def _error_line(custom_id: str) -> Dict[str, Any]:
+    return {
+        "id": "batch_req_err",
+        "custom_id": custom_id,
+        "response": {"status_code": 500, "body": {"error": {"message": "server overloaded"}}},
+        "error": None,
+    }
+
+
+def _write_jsonl(path: Path, rows: List[Dict[str, Any]]) -> None:
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+
+def _page(custom_id: str) -> str:
+    return custom_id.split(":", 1)[0]
+
+
+def test_results_attach_per_page(payload: Dict[str, Any], tmp_path: Path) -> None:
+    requests = build_batch_requests(payload, model=MODEL)
+    assert sorted(_page(r["custom_id"]) for r in requests) == sorted(NARRATIVE_PAGES)
+    assert all(r["body"]["model"] == MODEL for r in requests)
+
+    results_path = tmp_path / "results.jsonl"
+    _write_jsonl(results_path, [_ok_line(r["custom_id"], _page(r["custom_id"])) for r in reversed(requests)])
+    results, errors = read_batch_results(results_path)
+    assert errors == {}
+
+    p = json.loads(json.dumps(payload))
+    llm = attach_batch_results(p, results, errors, model=MODEL)
+    assert list(llm) == NARRATIVE_PAGES
+    for pk in NARRATIVE_PAGES:
+        assert p["narratives"][pk] == _narrative(pk)[pk]
+        assert p[pk]["computed"]["narratives"] == _narrative(pk)[pk]
+    assert set(p["narrative_fingerprints"]) == set(NARRATIVE_PAGES)
+
+
+def test_failed_and_unmatched_lines_are_reported(payload: Dict[str, Any], tmp_path: Path) -> None:
+    requests = build_batch_requests(payload, model=MODEL)
+    errored, orphaned = requests[0]["custom_id"], requests[1]["custom_id"]
+    rows = [_error_line(errored), _ok_line(None, _page(orphaned))]
+    rows += [_ok_line(r["custom_id"], _page(r["custom_id"])) for r in requests[2:]]
+    results_path = tmp_path / "results.jsonl"
+    _write_jsonl(results_path, rows)
+
+    results, errors = read_batch_results(results_path)
+    assert errors == {errored: "server overloaded", "line 2": "missing custom_id"}
+    assert len(results) == len(requests) - 2
+
+    p = json.loads(json.dumps(payload))
+    with pytest.raises(RuntimeError) as exc:
+        attach_batch_results(p, results, errors, model=MODEL)
+    msg = str(exc.value)
+    assert f"{_page(errored)}: server overloaded" in msg
+    assert f"{_page(orphaned)}: no result for {orphaned}" in msg
+    assert "narratives" not in p  # nothing attached from an incomplete result set
+
+
+def test_cli_emit_then_ingest_offline(payload: Dict[str, Any], tmp_path: Path) -> None:
+    inp = tmp_path / "report_payload_step3.json"
+    inp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    env["OPENAI_MODEL"] = MODEL
+
+    def step5(*args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, "-m", "src.step5_llm", "--in", str(inp), *args],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+        )
+
+    requests_path = tmp_path / "requests.jsonl"
+    step5("--batch-emit", str(requests_path))
+    requests = [json.loads(line) for line in requests_path.read_text(encoding="utf-8").splitlines()]
+    assert len(requests) == len(NARRATIVE_PAGES)
+
+    results_path = tmp_path / "results.jsonl"
+    _write_jsonl(results_path, [_ok_line(r["custom_id"], _page(r["custom_id"])) for r in requests])
+    out = step5("--batch-ingest", str(results_path))
+    assert f"Batch results: {len(NARRATIVE_PAGES)} ok, 0 failed" in out.stdout
+
+    step5_payload = json.loads((tmp_path / "report_payload_step5.json").read_text(encoding="utf-8"))
+    assert step5_payload["narratives"] == {pk: _narrative(pk)[pk] for pk in NARRATIVE_PAGES}
+    locality = payload["meta"]["locality"]
+    assert (tmp_path / f"{locality} Locality Report - Final.pdf").stat().st_size > 0